@@ -1,12 +1,40 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import numpy as np
 from datetime import datetime
-import json
-import base64
+import cProfile
+import io
+import pstats
+import re
 import time
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from obesitas.bulk import new_result_path, remove_stale_results, score_csv
+from obesitas.model import load_or_train_model
+from obesitas.analysis import ANALYSIS_CACHE, FIGURE_CACHE, ResultState, analyze, profile_fingerprint, result_figure
+from obesitas.config import ADMIN_TOKEN, METRICS_PORT, SESSION_MEMORY_LIMIT
+from obesitas.history import HISTORY_COLUMNS, HistoryStore
+from obesitas.export import available_formats, build_export, export_file_name, export_mime
+from obesitas.percentiles import load_percentile_index
+from obesitas.scenarios import HEATMAP_VALUES, ScenarioGrid, scenario_heatmap, scenario_recommendations, simulate
+from obesitas.session import SESSION_MEMORY, session_usage
+from obesitas.similar import load_or_build_index
+from obesitas.timeseries import RESOLUTIONS, aggregate, trend_figure
+from obesitas.texts import APP_CSS, BMI_CATEGORY_EXPLANATION, BMI_EXPLANATION, BMR_EXPLANATION
+from obesitas.timing import REGISTRY, start_metrics_server
+
+# Waktu setiap fase rerun; lap() menutup fase yang baru selesai
+rerun_timer = REGISTRY.rerun()
+
+# Profil cProfile satu rerun, diminta dari panel admin
+profiler = None
+if st.session_state.pop('profile_next_rerun', False):
+    profiler = cProfile.Profile()
+    profiler.enable()
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -16,518 +44,369 @@ st.set_page_config(
 )
 
 # CSS kustom untuk tampilan yang lebih baik
-st.markdown("""
-    <style>
-    /* Base styles */
-    body {
-        background-color: #1e1e1e;
-        color: white;
-    }
-    
-    /* Container styles */
-    .main {
-        padding: 1rem 2rem;
-    }
-    
-    /* Card styles */
-    .card {
-        background-color: #2c2c2c;
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        border-left: 5px solid #0066cc;
-        transition: all 0.3s ease;
-    }
-    
-    .card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 12px rgba(0,0,0,0.3);
-    }
-    
-    /* Section headers */
-    .section-header {
-        font-size: 1.4rem;
-        font-weight: bold;
-        color: #0066cc;
-        margin-bottom: 1.2rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #0066cc;
-    }
-    
-    /* Input field styling */
-    .stTextInput > div > div > input {
-        background-color: #3a3a3a;
-        color: white;
-        border: 1px solid #4a4a4a;
-        border-radius: 8px;
-        padding: 0.5rem;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        width: 100%;
-        padding: 0.8rem !important;
-        font-size: 1.2rem !important;
-        font-weight: bold !important;
-        background-color: #0066cc !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 10px !important;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        background-color: #0052a3 !important;
-        transform: translateY(-2px);
-    }
-    
-    /* Metric value styling */
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: bold;
-        text-align: center;
-        padding: 1rem;
-        background-color: #3a3a3a;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    
-    /* History table styling */
-    .history-table {
-        width: 100%;
-        border-collapse: collapse;
-        margin: 1rem 0;
-    }
-    
-    .history-table th, .history-table td {
-        padding: 0.8rem;
-        text-align: left;
-        border-bottom: 1px solid #4a4a4a;
-    }
-    
-    .history-table th {
-        background-color: #0066cc;
-        color: white;
-    }
-    
-    /* Toast notification styling */
-    .toast {
-        position: fixed;
-        bottom: 20px;
-        right: 20px;
-        padding: 1rem;
-        background-color: #28a745;
-        color: white;
-        border-radius: 8px;
-        z-index: 1000;
-        animation: slideIn 0.5s ease-out;
-    }
-    
-    @keyframes slideIn {
-        from {
-            transform: translateX(100%);
-            opacity: 0;
-        }
-        to {
-            transform: translateX(0);
-            opacity: 1;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(APP_CSS, unsafe_allow_html=True)
+rerun_timer.lap('css')
 
 # Inisialisasi session state
-if 'history' not in st.session_state:
-    st.session_state.history = []
 if 'show_success' not in st.session_state:
     st.session_state.show_success = False
 if 'success_time' not in st.session_state:
     st.session_state.success_time = None
+# Pemilik riwayat tersimpan disimpan di URL (?riwayat=<token>) agar bertahan saat reload
+# dan bisa di-bookmark. Konsekuensinya, siapa pun yang memegang tautan itu bisa melihat
+# riwayatnya; token acak 128-bit sehingga tidak bisa ditebak, tetapi jangan dibagikan.
+history_owner = st.query_params.get("riwayat", "")
+if not re.fullmatch(r"[0-9a-f]{32}", history_owner):
+    history_owner = uuid.uuid4().hex
+    st.query_params["riwayat"] = history_owner
+st.session_state.history_owner = history_owner
 
-# Fungsi untuk menghitung BMI, BMR, dan kategori
-def calculate_metrics(weight, height, age, gender):
-    bmi = weight / (height ** 2)
-    
-    if gender == "Laki-laki":
-        bmr = 88.362 + (13.397 * weight) + (4.799 * height * 100) - (5.677 * age)
-    else:
-        bmr = 447.593 + (9.247 * weight) + (3.098 * height * 100) - (4.330 * age)
-    
-    if bmi < 18.5:
-        category = "Insufficient Weight"
-        color = "#ff6b6b"
-    elif 18.5 <= bmi < 25:
-        category = "Normal Weight"
-        color = "#51cf66"
-    elif 25 <= bmi < 30:
-        category = "Overweight Level I"
-        color = "#ffd43b"
-    elif 30 <= bmi < 35:
-        category = "Overweight Level II"
-        color = "#fa5252"
-    elif 35 <= bmi < 40:
-        category = "Overweight Level III"
-        color = "#fa5252"
-    else:
-        category = "Overweight Level IV"
-        color = "#fa5252"
+# Panel admin dan riwayat semua pengguna hanya dengan ?admin=<OBESITAS_ADMIN_TOKEN>
+is_admin = bool(ADMIN_TOKEN) and st.query_params.get("admin") == ADMIN_TOKEN
 
-    return bmi, bmr, category, color
+# Model klasifikasi dilatih/dimuat sekali per proses
+@st.cache_resource(show_spinner="Memuat model klasifikasi...")
+def get_model():
+    return load_or_train_model()
 
-# Fungsi untuk generate rekomendasi
-def generate_recommendations(bmi_category: str, input_data: dict) -> dict:
-    recommendations = {
-        "🥗 Rekomendasi Cara Diet": [],
-        "💪 Rekomendasi Olahraga": [],
-        "🧘‍♀️ Rekomendasi Gaya Hidup": []
-    }
-    
-    # Diet Recommendations based on input data
-    diet_factors = []
-    if input_data.get('FAVC', '') == 'ya':
-        diet_factors.append("Anda sering mengonsumsi makanan tinggi kalori")
-    if input_data.get('FCVC', 0) < 2:
-        diet_factors.append("Konsumsi sayur dan buah kurang")
-    if input_data.get('NCP', '') in ['1', '2']:
-        diet_factors.append("Jumlah makan utama per hari kurang")
-    if input_data.get('CAEC', '') in ['Sering', 'Selalu']:
-        diet_factors.append("Sering mengonsumsi camilan")
-    
-    # Determine target based on BMI category
-    if bmi_category == "Insufficient Weight":
-        Target = "Meningkatkan berat badan 0.5-1 kg per minggu hingga mencapai BMI minimal 18.5"
-        recommendations["🥗 Rekomendasi Cara Diet"] = [
-            "Tingkatkan asupan kalori 500-1000 kkal di atas kebutuhan maintenance",
-            "Konsumsi protein tinggi (1.6-2.2 gram/kg berat badan)",
-            "Makan 5-6 kali sehari dengan porsi sedang",
-            "Fokus pada makanan padat nutrisi dan kalori"
-        ]
-        # Add specific warnings based on input
-        if diet_factors:
-            recommendations["🥗 Rekomendasi Cara Diet"].append(f"Perhatian: {', '.join(diet_factors)}")
-    
-    elif bmi_category == "Normal Weight":
-        Target = "Mempertahankan berat badan current dengan fluktuasi maksimal 2 kg"
-        recommendations["🥗 Rekomendasi Cara Diet"] = [
-            "Pertahankan asupan kalori sesuai kebutuhan maintenance",
-            "Konsumsi protein 1.2-1.6 gram/kg berat badan",
-            "Jaga pola makan 3 kali sehari dengan 2 snack",
-            "Seimbangkan makronutrien (50% karbo, 30% protein, 20% lemak)"
-        ]
-        # Add specific advice based on input
-        if diet_factors:
-            recommendations["🥗 Rekomendasi Cara Diet"].append(f"Perhatian: {', '.join(diet_factors)}")
-    
-    else:
-        Target = "Menurunkan berat badan 0.5-1 kg per minggu hingga mencapai BMI 24.9"
-        recommendations["🥗 Rekomendasi Cara Diet"] = [
-            "Kurangi asupan kalori 500-750 kkal di bawah maintenance",
-            "Tingkatkan protein (1.8-2.2 gram/kg ideal body weight)",
-            "Batasi karbohidrat sederhana dan lemak jenuh",
-            "Makan 3 kali sehari dengan porsi terkontrol",
-            "Utamakan sayuran dan protein lean"
-        ]
-        # Add specific warnings based on input
-        if diet_factors:
-            recommendations["🥗 Rekomendasi Cara Diet"].append(f"Fokus perbaiki: {', '.join(diet_factors)}")
-    
-    recommendations["Target"] = Target
-    
-    # Exercise Recommendations based on Physical Activity Frequency (FAF)
-    exercise_intensity = {
-        "1": {
-            "base_recs": [
-                "Mulai dengan 30 menit jalan kaki setiap hari",
-                "Tambahkan latihan kekuatan 2x seminggu",
-                "Target: 150 menit aktivitas sedang per minggu",
-                "Fokus pada latihan dasar seperti squat, push-up, dan plank"
-            ]
-        },
-        "2": {
-            "base_recs": [
-                "Pertahankan rutinitas olahraga 3-4x seminggu",
-                "Kombinasikan cardio dan strength training",
-                "Target: 200 menit aktivitas sedang per minggu",
-                "Tambahkan variasi latihan untuk menghindari plateau"
-            ]
-        },
-        "3": {
-            "base_recs": [
-                "Lanjutkan rutinitas olahraga intensif",
-                "Fokus pada high-intensity interval training (HIIT)",
-                "Target: 250-300 menit aktivitas sedang per minggu",
-                "Pertimbangkan untuk bekerja dengan personal trainer"
-            ]
+
+# Indeks persentil populasi referensi, dibangun sekali per proses
+@st.cache_resource
+def get_percentile_index():
+    return load_percentile_index()
+
+
+@st.cache_resource(show_spinner="Menyiapkan indeks profil serupa...")
+def get_similarity_index():
+    return load_or_build_index()
+
+
+# Penyimpanan riwayat dibagi ke semua sesi dalam satu proses
+# File hasil unggahan dari sesi yang ditinggalkan dibersihkan saat start dan setiap jam
+@st.cache_resource(ttl=3600)
+def clean_bulk_results():
+    return remove_stale_results()
+
+
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+
+# Riwayat pemilik yang sudah lama tidak aktif dihapus saat start dan setiap jam
+@st.cache_resource(ttl=3600)
+def purge_history():
+    return get_history_store().purge()
+
+
+# Endpoint /metrics Prometheus, dijalankan sekali per proses jika OBESITAS_METRICS_PORT diisi;
+# None jika port sudah dipakai (worker lain), tanpa menghentikan aplikasi
+@st.cache_resource
+def start_metrics():
+    return start_metrics_server(
+        METRICS_PORT,
+        gauges=lambda: {
+            **{f"analysis_cache_{key}": value for key, value in ANALYSIS_CACHE.stats().items()},
+            **SESSION_MEMORY.totals(),
         }
-    }
-    
-    # Customize exercise recommendations
-    extra_exercise_factors = []
-    if input_data.get('TUE', 0) > 8:
-        extra_exercise_factors.append("Waktu screen time tinggi")
-    
-    exercise_recs = exercise_intensity.get(input_data.get('FAF', '1'), exercise_intensity['1'])['base_recs']
-    
-    if extra_exercise_factors:
-        exercise_recs.append(f"Perhatian: {', '.join(extra_exercise_factors)}")
-    
-    recommendations["💪 Rekomendasi Olahraga"] = exercise_recs
-    
-    # Lifestyle Recommendations
-    lifestyle_recs = []
-    
-    if input_data.get('CH2O', 0) < 2.0:
-        lifestyle_recs.append("Tingkatkan konsumsi air minimal 2L/hari")
-    
-    if input_data.get('SMOKE', '') == 'ya':
-        lifestyle_recs.append("Pertimbangkan program berhenti merokok")
-    
-    if input_data.get('TUE', 0) > 8:
-        lifestyle_recs.extend([
-            "Kurangi screen time, gunakan teknik 20-20-20 untuk kesehatan mata",
-            "Atur postur saat menggunakan gadget"
-        ])
-    
-    # If no specific recommendations, add general advice
-    if not lifestyle_recs:
-        lifestyle_recs = [
-            "Pertahankan gaya hidup sehat",
-            "Jaga kualitas tidur 7-9 jam per hari",
-            "Kelola stress dengan meditasi atau yoga",
-            "Lakukan check-up kesehatan rutin"
-        ]
-    
-    recommendations["🧘‍♀️ Rekomendasi Gaya Hidup"] = lifestyle_recs
-    
-    return recommendations
-
-
-# Fungsi untuk export data ke CSV
-def get_csv_download_link(df):
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="riwayat_analisis.csv">Download CSV</a>'
-    return href
+    )
+
+
+if METRICS_PORT:
+    start_metrics()
+clean_bulk_results()
+purge_history()
+
+
+# Fungsi untuk export riwayat; file baru dibangun saat tombol download diklik
+def export_history(store, fmt, name_filter, owner):
+    """Cakupan sama dengan tabel riwayat: hanya baris milik `owner` (None hanya untuk admin)."""
+    def build():
+        started = time.perf_counter()
+        data = build_export(store.iter_chunks(name=name_filter, owner=owner), fmt, HISTORY_COLUMNS)
+        REGISTRY.observe('export', time.perf_counter() - started)
+        return data
+    return build
 
 # Header Aplikasi
 st.markdown('<h1 style="text-align: center; color: #0066cc;">🏥 Sistem Analisis dan Prediksi Obesitas</h1>', unsafe_allow_html=True)
 
 # Membuat tab
-tabs = st.tabs(["📝 Input Data", "📊 Hasil Analisis", "📈 Riwayat", "💡 Rekomendasi"])
+tabs = st.tabs(["📝 Input Data", "📊 Hasil Analisis", "📈 Riwayat", "💡 Rekomendasi", "🔮 Simulasi"])
+rerun_timer.lap('setup')
 
 # Tab Input Data
 with tabs[0]:
-    with st.form(key="input_form"):  # Added key parameter
-        st.markdown('<div class="section-header">Data Pribadi</div>', unsafe_allow_html=True)
+    input_mode = st.radio("Mode Input", ["Formulir", "Unggah CSV"], horizontal=True)
+
+    if input_mode == "Unggah CSV":
+        submitted = False
+        st.markdown('<div class="section-header">Unggah Data Massal</div>', unsafe_allow_html=True)
+        st.caption("Format kolom sama dengan ObesityDataSet_raw_and_data_sinthetic.csv. File diproses per chunk sehingga ukuran file tidak membebani memori.")
+        uploaded_file = st.file_uploader("Pilih file CSV", type=["csv"])
+
+        if uploaded_file is not None and st.button("Proses File"):
+            progress_bar = st.progress(0.0, text="Memproses data...")
+
+            def update_progress(rows, fraction):
+                progress_bar.progress(fraction or 0.0, text=f"{rows:,} baris diproses")
+
+            # File hasil unggahan sebelumnya dihapus agar file sementara tidak menumpuk
+            previous_result = st.session_state.pop('bulk_result', None)
+            if previous_result and os.path.exists(previous_result):
+                os.remove(previous_result)
+
+            # Hasil ditulis bertahap ke file sementara, bukan ditampung di memori
+            output = new_result_path()
+            try:
+                rows = score_csv(uploaded_file, output, total_bytes=uploaded_file.size, progress=update_progress)
+            except KeyError as err:
+                os.remove(output)
+                progress_bar.empty()
+                st.error(f"Kolom wajib tidak ditemukan di file: {err}")
+            except (ValueError, pd.errors.ParserError) as err:
+                os.remove(output)
+                progress_bar.empty()
+                st.error(f"File tidak dapat diproses: {err}")
+            else:
+                progress_bar.progress(1.0, text=f"Selesai: {rows:,} baris diproses")
+                st.session_state.bulk_result = output
+
+        result_path = st.session_state.get('bulk_result')
+        if result_path and os.path.exists(result_path):
+            # File dibaca hanya saat tombol diklik, bukan di setiap rerun
+            def read_result(path=result_path):
+                with open(path, "rb") as result_file:
+                    return result_file.read()
+
+            st.download_button(
+                "Download Hasil (CSV.GZ)",
+                data=read_result,
+                file_name="hasil_analisis.csv.gz",
+                mime="application/gzip"
+            )
+    else:
+        with st.form(key="input_form"):  # Added key parameter
+            st.markdown('<div class="section-header">Data Pribadi</div>', unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
-        with col1:
-            name = st.text_input("Nama Lengkap", value="")
-            age = st.number_input("Usia (Tahun)", min_value=15, max_value=100, value=25) 
-        with col2:
-            gender = st.selectbox("Jenis Kelamin", ["", "Laki-laki", "Perempuan"])
-            height = st.number_input("Berapa tinggi badan (m) Anda?", min_value=1.0, max_value=2.5, value=1.5, step=0.01) 
+            col1, col2 = st.columns(2)
+            with col1:
+                name = st.text_input("Nama Lengkap", value="")
+                age = st.number_input("Usia (Tahun)", min_value=15, max_value=100, value=25) 
+            with col2:
+                gender = st.selectbox("Jenis Kelamin", ["", "Laki-laki", "Perempuan"])
+                height = st.number_input("Berapa tinggi badan (m) Anda?", min_value=1.0, max_value=2.5, value=1.5, step=0.01) 
         
-        st.markdown('<div class="section-header">Pengukuran Fisik</div>', unsafe_allow_html=True)
+            st.markdown('<div class="section-header">Pengukuran Fisik</div>', unsafe_allow_html=True)
         
-        col3, col4 = st.columns(2)
-        with col3:
-            weight = st.number_input("Berapa berat badan (kg) Anda?", min_value=5.0, max_value=300.0, value=60.0, step=0.1)  
-        with col4:
-            family_history = st.selectbox("Apakah ada riwayat obesitas dalam keluarga Anda?", ["", "ya", "tidak"])
+            col3, col4 = st.columns(2)
+            with col3:
+                weight = st.number_input("Berapa berat badan (kg) Anda?", min_value=5.0, max_value=300.0, value=60.0, step=0.1)  
+            with col4:
+                family_history = st.selectbox("Apakah ada riwayat obesitas dalam keluarga Anda?", ["", "ya", "tidak"])
         
-        st.markdown('<div class="section-header">Pola Makan</div>', unsafe_allow_html=True)
+            st.markdown('<div class="section-header">Pola Makan</div>', unsafe_allow_html=True)
         
-        col5, col6 = st.columns(2)
-        with col5:
-            FAVC = st.selectbox("Apakah Anda sering mengkonsumsi makanan tinggi kalori?", ["", "ya", "tidak"])
-            FCVC = st.selectbox("Apakah anda sering mengkonsumsi sayur dan buah? (1 Tidak Pernah, 2 Jarang, 3 Selalu)", [1, 2, 3])  
-            NCP = st.selectbox("Berapa kali Anda makan utama per hari nya?", ["", "1", "2", "3", "4"])
+            col5, col6 = st.columns(2)
+            with col5:
+                FAVC = st.selectbox("Apakah Anda sering mengkonsumsi makanan tinggi kalori?", ["", "ya", "tidak"])
+                FCVC = st.selectbox("Apakah anda sering mengkonsumsi sayur dan buah? (1 Tidak Pernah, 2 Jarang, 3 Selalu)", [1, 2, 3])  
+                NCP = st.selectbox("Berapa kali Anda makan utama per hari nya?", ["", "1", "2", "3", "4"])
         
-        with col6:
-            CAEC = st.selectbox("Apakah Anda sering mengkonsumsi camilan di antara waktu makan?", ["", "Tidak Pernah", "Kadang", "Sering", "Selalu"])
-            SMOKE = st.selectbox("Apakah Anda merokok?", ["", "ya", "tidak"])
+            with col6:
+                CAEC = st.selectbox("Apakah Anda sering mengkonsumsi camilan di antara waktu makan?", ["", "Tidak Pernah", "Kadang", "Sering", "Selalu"])
+                SMOKE = st.selectbox("Apakah Anda merokok?", ["", "ya", "tidak"])
         
-        st.markdown('<div class="section-header">Gaya Hidup</div>', unsafe_allow_html=True)
+            st.markdown('<div class="section-header">Gaya Hidup</div>', unsafe_allow_html=True)
         
-        col7, col8 = st.columns(2)
-        with col7:
-            CH2O = st.number_input("Anda mengkonsumsi air per Hari berapa Liter?", min_value=1.0, max_value=10.0, value=2.0, step=0.1)  
-            FAF = st.selectbox("Seberapa sering Anda berolahraga per Minggu nya? (1 Tidak Pernah, 2 Kadang, 3 Sering)", ["", "1", "2", "3"])
-            TUE = st.number_input("Berapa jam Anda menggunakan perangkat elektronik per hari?", min_value=0.0, max_value=24.0, value=2.0, step=0.1)
+            col7, col8 = st.columns(2)
+            with col7:
+                CH2O = st.number_input("Anda mengkonsumsi air per Hari berapa Liter?", min_value=1.0, max_value=10.0, value=2.0, step=0.1)  
+                FAF = st.selectbox("Seberapa sering Anda berolahraga per Minggu nya? (1 Tidak Pernah, 2 Kadang, 3 Sering)", ["", "1", "2", "3"])
+                TUE = st.number_input("Berapa jam Anda menggunakan perangkat elektronik per hari?", min_value=0.0, max_value=24.0, value=2.0, step=0.1)
         
-        with col8:
-            CALC = st.selectbox("Apakah Anda Mengkonsumsi Alkohol?", ["", "Tidak Pernah", "Kadang", "Sering", "Selalu"])
-            SCC = st.selectbox("Apakah Anda menghitung konsumsi kalori harian?", ["", "ya", "tidak"])
-            MTRANS = st.selectbox("Alat transportasi apa yang Anda gunakan setiap hari?", ["", "Mobil", "Motor", "Sepeda", "Transportasi Publik", "Jalan Kaki"])
+            with col8:
+                CALC = st.selectbox("Apakah Anda Mengkonsumsi Alkohol?", ["", "Tidak Pernah", "Kadang", "Sering", "Selalu"])
+                SCC = st.selectbox("Apakah Anda menghitung konsumsi kalori harian?", ["", "ya", "tidak"])
+                MTRANS = st.selectbox("Alat transportasi apa yang Anda gunakan setiap hari?", ["", "Mobil", "Motor", "Sepeda", "Transportasi Publik", "Jalan Kaki"])
         
-        # Submit button inside the form
-        submitted = st.form_submit_button("Analisis Data")
-
-# Penjelasan BMI
-bmi_explanation = """
-### Apa itu BMI?
-Body Mass Index (BMI) atau Indeks Massa Tubuh (IMT) adalah pengukuran yang digunakan untuk menilai apakah berat badan seseorang berada dalam kategori normal, kurang, atau berlebih. BMI dihitung dengan membagi berat badan (dalam kilogram) dengan kuadrat tinggi badan (dalam meter).
-"""
-### Penjelasan Kategori BMI:
-kategori_bmi_explanation = """
-### Kategori BMI
-- **Insufficient Weight (< 18.5)**: 
-  Berat badan kurang dari normal, berisiko terhadap beberapa masalah kesehatan.
-
-- **Normal Weight (18.5 - 24.9)**: 
-  Berat badan ideal, menunjukkan keseimbangan yang baik.
-
-- **Overweight Level I (25.0 - 29.9)**: 
-  Berat badan berlebih tingkat awal.
-
-- **Overweight Level II (30.0 - 34.9)**: 
-  Obesitas tingkat I, berisiko terhadap penyakit metabolik.
-
-- **Overweight Level III (35.0 - 39.9)**: 
-  Obesitas tingkat II, risiko kesehatan serius.
-
-- **Overweight Level IV (≥ 40)**: 
-  Obesitas tingkat III, risiko kesehatan sangat serius.
-"""
-
-# Penjelasan BMR
-bmr_explanation = """
-### Apa itu BMR?
-Basal Metabolic Rate (BMR) atau Laju Metabolisme Basal adalah jumlah kalori yang dibutuhkan tubuh untuk menjalankan fungsi dasar saat istirahat, seperti bernafas, mengatur suhu tubuh, dan memelihara fungsi organ vital. BMR berbeda untuk setiap orang dan dipengaruhi oleh faktor seperti usia, jenis kelamin, berat badan, dan tinggi badan.
-"""
+            # Submit button inside the form
+            submitted = st.form_submit_button("Analisis Data")
+
+rerun_timer.lap('form')
+
+# Analisis hanya dihitung saat submit dengan isian yang berubah; hasilnya disimpan
+# di session dengan sidik jari isian, dan rerun lain (ganti tab, widget lain) cukup merender ulang
+form_complete = submitted and all([name, age, gender, height, weight, family_history, FAVC, FCVC, NCP, CAEC, SMOKE, CH2O, FAF, TUE, CALC, SCC, MTRANS])
+if form_complete:
+    analysis_input = {
+        'gender': gender, 'age': age, 'height': height, 'weight': weight,
+        'family_history': family_history, 'FAVC': FAVC, 'FCVC': FCVC, 'NCP': NCP,
+        'CAEC': CAEC, 'SMOKE': SMOKE, 'CH2O': CH2O, 'SCC': SCC,
+        'FAF': FAF, 'TUE': TUE, 'CALC': CALC, 'MTRANS': MTRANS
+    }
+    fingerprint = profile_fingerprint(analysis_input)
+    result = st.session_state.get('result')
+    if result is None or result.fingerprint != fingerprint:
+        # Menghitung BMI, BMR, kategori, rekomendasi, dan prediksi model (di-cache per profil)
+        analysis = analyze(analysis_input, get_model())
+        result = ResultState(
+            fingerprint,
+            analysis,
+            rank=get_percentile_index().rank(gender, age, analysis.bmi, analysis.bmr),
+            neighbors=tuple(get_similarity_index().query(analysis_input)),
+            profile=analysis_input,
+        )
+        st.session_state.result = result
+    rerun_timer.lap('analysis')
+
+    # Menyimpan data ke history; setiap submit adalah satu pengukuran baru
+    analysis = result.analysis
+    input_data = {
+        'timestamp': datetime.now().replace(microsecond=0),
+        'name': name,
+        'age': age,
+        'gender': gender,
+        'height': height,
+        'weight': weight,
+        'bmi': round(analysis.bmi, 2),
+        'bmr': round(analysis.bmr, 2),
+        'category': analysis.category,
+        'prediction': analysis.prediction,
+        'FAF': FAF,
+        'TUE': TUE,
+        'CH2O': CH2O,
+        'SMOKE': SMOKE
+    }
+    get_history_store().append(input_data, owner=st.session_state.history_owner)
+
+    # Notifikasi sukses hanya untuk submit ini
+    st.session_state.show_success = True
+    st.session_state.success_time = time.time()
+    rerun_timer.lap('history_append')
+
+result = st.session_state.get('result')
 
 # Tab Hasil Analisis
 with tabs[1]:
-    if submitted:
-        if not all([name, age, gender, height, weight, family_history, FAVC, FCVC, NCP, CAEC, SMOKE, CH2O, FAF, TUE, CALC, SCC, MTRANS]):
-            st.error("Mohon lengkapi semua field input!")
-        else:
-            # Menghitung BMI, BMR, dan kategori
-            bmi, bmr, category, color = calculate_metrics(weight, height, age, gender)
-            
-            # Menyimpan data ke history
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            input_data = {
-                'timestamp': current_time,
-                'name': name,
-                'age': age,
-                'gender': gender,
-                'height': height,
-                'weight': weight,
-                'bmi': round(bmi, 2),
-                'bmr': round(bmr, 2),
-                'category': category,
-                'FAF': FAF,
-                'TUE': TUE,
-                'CH2O': CH2O,
-                'SMOKE': SMOKE
-            }
-            st.session_state.history.append(input_data)
-            
-            # Menampilkan hasil analisis
-            # BMR
-            st.markdown(bmr_explanation)
-            st.markdown(f"""
-            <div class="card">
-                <h2>Hasil Analisis BMR Anda</h2>
-                <div class="metric-value">BMR: {bmr:.2f} kkal/hari</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # BMI
-            st.markdown(bmi_explanation)
-            st.markdown(f"""
-            <div class="card">
-                <h2 style="color: {color};">Hasil Analisis BMI Anda</h2>
-                <div class="metric-value" style="color: {color};">BMI: {bmi:.2f}</div>
-                <h3 style="text-align: center; color: {color};">{category}</h3>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown('<div class="section-header">Skala BMI Anda</div>', unsafe_allow_html=True)
-        
-            # Definisikan batas-batas BMI dan warna
-            bmi_ranges = [
-                {'max': 18.5, 'color': '#ff6b6b', 'label': 'Kurang'},
-                {'max': 25, 'color': '#51cf66', 'label': 'Normal'},
-                {'max': 30, 'color': '#ffd43b', 'label': 'Berlebih'},
-                {'max': 40, 'color': '#fa5252', 'label': 'Obesitas'},
-                {'max': float('inf'), 'color': '#fa5252', 'label': 'Obesitas'}
-            ]
-
-            fig = go.Figure()
-
-            # Tambahkan area untuk setiap rentang BMI
-            for i, range_info in enumerate(bmi_ranges):
-                fig.add_trace(go.Scatter(
-                    x=[0 if i == 0 else bmi_ranges[i-1]['max'], range_info['max']],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color=range_info['color'], width=10),
-                    name=range_info['label']
-                ))
-
-            # Tambahkan marker untuk label
-            fig.add_trace(go.Scatter(
-                x=[0, 18.5, 25, 30, 40],
-                y=[0, 0, 0, 0, 0],
-                mode='markers+text',
-                text=['', 'Kurang', 'Normal', 'Berlebih', 'Obesitas'],
-                textposition='bottom center',
-                marker=dict(
-                    size=20,
-                    color=['#ff6b6b', '#51cf66', '#ffd43b', '#fa5252', '#fa5252'],
-                )
-            ))
-
-            # Tambahkan garis vertikal untuk BMI pengguna
-            fig.add_vline(
-                x=bmi, 
-                line_dash="dash", 
-                line_color=color,
-                annotation_text=f"BMI Anda: {bmi:.2f}",
-                annotation_position="top right"
-            )
+    if submitted and not form_complete:
+        st.error("Mohon lengkapi semua field input!")
+    elif result is not None:
+        if st.session_state.show_success:
+            st.success("Analisis selesai dan disimpan ke riwayat.")
+            st.session_state.show_success = False
 
-            fig.update_layout(
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, title='BMI'),
-                yaxis=dict(showgrid=False, showticklabels=False),
-                height=200,
-                margin=dict(l=20, r=20, t=20, b=40)
-            )
+        analysis, rank = result.analysis, result.rank
+        bmi, bmr, category, color = analysis.bmi, analysis.bmr, analysis.category, analysis.color
+        predicted_label, predicted_proba = analysis.prediction, analysis.prediction_proba
+
+        # Menampilkan hasil analisis
+        # BMR
+        st.markdown(BMR_EXPLANATION)
+        st.markdown(f"""
+        <div class="card">
+            <h2>Hasil Analisis BMR Anda</h2>
+            <div class="metric-value">BMR: {bmr:.2f} kkal/hari</div>
+            <p style="text-align: center;">Lebih tinggi dari {rank.bmr:.0f}% orang di data referensi ({rank.group_label}, n={rank.group_size})</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-            st.plotly_chart(fig, use_container_width=True)
-            st.markdown(kategori_bmi_explanation)
+        # BMI
+        st.markdown(BMI_EXPLANATION)
+        st.markdown(f"""
+        <div class="card">
+            <h2 style="color: {color};">Hasil Analisis BMI Anda</h2>
+            <div class="metric-value" style="color: {color};">BMI: {bmi:.2f}</div>
+            <h3 style="text-align: center; color: {color};">{category}</h3>
+            <p style="text-align: center;">BMI Anda lebih tinggi dari {rank.bmi:.0f}% orang di data referensi ({rank.group_label}, n={rank.group_size})</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Prediksi model
+        st.markdown(f"""
+        <div class="card">
+            <h2>Prediksi Model Klasifikasi</h2>
+            <div class="metric-value">{predicted_label}</div>
+            <p style="text-align: center;">Keyakinan model: {predicted_proba:.0%}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Profil serupa dari data referensi (KD-tree, tanpa memindai dataset)
+        st.markdown('<div class="section-header">Profil Serupa di Data Referensi</div>', unsafe_allow_html=True)
+        st.dataframe([{
+            'Kategori': n.label,
+            'Jenis Kelamin': n.gender,
+            'Usia': round(n.age),
+            'Tinggi (m)': round(n.height, 2),
+            'Berat (kg)': round(n.weight, 1),
+            'Jarak': round(n.distance, 2),
+        } for n in result.neighbors], use_container_width=True, hide_index=True)
+
+        st.markdown('<div class="section-header">Skala BMI Anda</div>', unsafe_allow_html=True)
+        rerun_timer.lap('results')
+
+        # Figure dibagi antar sesi per sidik jari isian, tidak disimpan di session state
+        st.plotly_chart(result_figure(result), use_container_width=True)
+        rerun_timer.lap('figure')
+        st.markdown(BMI_CATEGORY_EXPLANATION)
     else:
         st.info("📋 Silakan lengkapi formulir input data terlebih dahulu untuk mendapatkan hasil analisis personal.")
 
-            
-# Menampilkan notifikasi sukses
-st.session_state.show_success = True
-st.session_state.success_time = time.time()
+# Penjelasan kategori setelah grafik (atau info formulir kosong) dicatat sebagai fase sendiri
+rerun_timer.lap('results_footer')
 
 # Tab Riwayat
 with tabs[2]:
-    if st.session_state.history:
-        history_df = pd.DataFrame(st.session_state.history)
+    history_store = get_history_store()
+    history_owner = st.session_state.history_owner
+    if is_admin and st.checkbox("Tampilkan riwayat semua pengguna (admin)"):
+        history_owner = None
+    if history_store.count(owner=history_owner):
         st.markdown('<div class="section-header">Riwayat Analisis</div>', unsafe_allow_html=True)
+        if history_owner is not None:
+            st.caption("Riwayat terhubung ke tautan halaman ini. Simpan tautannya untuk membuka riwayat lagi, "
+                       "dan jangan dibagikan: siapa pun yang memiliki tautan dapat melihat riwayat ini.")
+
+        col_filter, col_size, col_page = st.columns([2, 1, 1])
+        with col_filter:
+            name_filter = st.text_input("Filter Nama", value="").strip()
+        with col_size:
+            page_size = st.selectbox("Baris per halaman", [25, 50, 100], index=1)
+        total_rows = history_store.count(name_filter, owner=history_owner)
+        total_pages = max(1, -(-total_rows // page_size))
+        with col_page:
+            page_number = st.number_input(f"Halaman (dari {total_pages})", min_value=1, max_value=total_pages, value=1)
+
+        # Hanya satu jendela riwayat yang diambil dari database
+        history_df = history_store.page((page_number - 1) * page_size, page_size, name_filter, owner=history_owner)
+        st.caption(f"Total {total_rows} entri")
         st.dataframe(history_df)
-        st.markdown(get_csv_download_link(history_df), unsafe_allow_html=True)
+        rerun_timer.lap('history_table')
 
-        # Visualisasi trend BMI
-        fig = px.line(history_df, x='timestamp', y='bmi', title='Trend BMI Over Time')
-        st.plotly_chart(fig)
+        # Trend BMI dari agregat harian di database; titik dibatasi agar ringan di browser
+        resolution = st.radio("Resolusi Trend", ['Harian', 'Mingguan'], horizontal=True)
+        trend = aggregate(history_store.daily_trend(name_filter, owner=history_owner), RESOLUTIONS[resolution])
+        title = f"Trend BMI {resolution} - {name_filter}" if name_filter else f"Trend BMI {resolution}"
+        st.plotly_chart(trend_figure(trend, title), use_container_width=True)
+        rerun_timer.lap('history_trend')
+
+        col_format, col_download = st.columns([1, 1])
+        with col_format:
+            export_format = st.selectbox("Format Export", available_formats())
+        with col_download:
+            st.download_button(
+                "Download Riwayat",
+                data=export_history(history_store, export_format, name_filter, history_owner),
+                file_name=export_file_name("riwayat_analisis", export_format),
+                mime=export_mime(export_format)
+            )
+        rerun_timer.lap('export_button')
     else:
         st.info("Belum ada riwayat analisis.")
 
 # Tab Rekomendasi
 with tabs[3]:
-    if 'submitted' not in locals() or not submitted:
+    if result is None:
         st.info("📋 Silakan lengkapi formulir input data terlebih dahulu untuk mendapatkan rekomendasi personal.")
         
         # guide tab rekomendasi
@@ -546,14 +425,131 @@ with tabs[3]:
         """)
     else:
         st.markdown('<div class="section-header">🎯 Target</div>', unsafe_allow_html=True)
-        recommendations = generate_recommendations("Normal Weight" if 'category' not in locals() else category, {
-            'FAF': FAF, 'TUE': TUE, 'SMOKE': SMOKE, 'CH2O': CH2O,
-            'FAVC': FAVC, 'FCVC': FCVC, 'NCP': NCP, 'CAEC': CAEC
-        })
+        recommendations = result.analysis.recommendations
         if 'Target' in recommendations:
             st.markdown(f"### {recommendations['Target']}")
         for key, recs in recommendations.items():
             if key != 'Target':
                 st.markdown(f'<div class="section-header">{key.capitalize()}</div>', unsafe_allow_html=True)
                 for rec in recs:
-                    st.write(f"- {rec}")
\ No newline at end of file
+                    st.write(f"- {rec}")
+
+rerun_timer.lap('recommendations')
+
+# Tab Simulasi: grid "bagaimana jika" dari profil yang sudah dianalisis
+with tabs[4]:
+    if result is None:
+        st.info("📋 Silakan lengkapi formulir input data terlebih dahulu untuk mensimulasikan perubahan gaya hidup.")
+    else:
+        base_weight = result.profile['weight']
+        with st.form("scenario_form"):
+            col_weight, col_faf = st.columns(2)
+            with col_weight:
+                weight_range = st.slider("Perubahan Berat Badan (kg)", -30, 30, (-10, 5))
+                weight_step = st.select_slider("Langkah Berat (kg)", [0.5, 1, 2, 5], value=1)
+            with col_faf:
+                faf_values = st.multiselect("Frekuensi Olahraga (FAF)", ["1", "2", "3"], default=["1", "2", "3"])
+                water_values = st.multiselect("Konsumsi Air (Liter)", [1.0, 1.5, 2.0, 2.5, 3.0, 4.0], default=[1.0, 1.5, 2.0, 2.5, 3.0])
+                screen_values = st.multiselect("Screen Time (Jam)", [0.0, 1.0, 2.0, 3.0, 5.0, 8.0, 10.0, 12.0], default=[1.0, 3.0, 5.0, 8.0, 10.0])
+            st.form_submit_button("Jalankan Simulasi")
+
+        grid = ScenarioGrid(
+            weight_deltas=tuple(float(d) for d in np.arange(weight_range[0], weight_range[1] + weight_step / 2, weight_step)),
+            faf=tuple(faf_values),
+            water=tuple(sorted(water_values)),
+            screen=tuple(sorted(screen_values)),
+        ).within_weight_range(base_weight)
+        if not len(grid):
+            st.warning("Pilih minimal satu nilai untuk setiap variabel, dengan berat hasil perubahan di antara 5-300 kg.")
+        else:
+            # Seluruh grid dihitung dalam satu panggilan batch dan di-cache per profil + grid
+            scenarios = simulate(result.profile, grid, get_model())
+            heatmap_label = st.radio("Nilai Heatmap", list(HEATMAP_VALUES), horizontal=True)
+            st.caption(f"{len(grid):,} skenario dari berat {base_weight:.1f} kg")
+            st.plotly_chart(scenario_heatmap(scenarios, grid, HEATMAP_VALUES[heatmap_label]), use_container_width=True)
+
+            # Rincian satu skenario diambil dari hasil grid, tanpa menghitung ulang
+            st.markdown('<div class="section-header">Rincian Skenario</div>', unsafe_allow_html=True)
+            col_a, col_b, col_c, col_d = st.columns(4)
+            delta = col_a.selectbox("Perubahan Berat (kg)", grid.weight_deltas, index=grid.weight_deltas.index(min(grid.weight_deltas, key=abs)))
+            faf = col_b.selectbox("FAF", grid.faf)
+            water = col_c.selectbox("Air (L)", grid.water)
+            screen = col_d.selectbox("Screen Time (Jam)", grid.screen)
+            row = scenarios[
+                (scenarios['weight_delta'] == delta) & (scenarios['FAF'] == faf)
+                & (scenarios['CH2O'] == water) & (scenarios['TUE'] == screen)
+            ].iloc[0]
+            col_bmi, col_bmr, col_pred = st.columns(3)
+            col_bmi.metric("BMI", f"{row['bmi']:.2f}", f"{row['bmi'] - result.analysis.bmi:+.2f}", delta_color="inverse")
+            col_bmr.metric("BMR (kkal/hari)", f"{row['bmr']:.0f}", f"{row['bmr'] - result.analysis.bmr:+.0f}", delta_color="off")
+            col_pred.metric("Prediksi Model", row['prediction'])
+            for key, recs in scenario_recommendations(row).items():
+                if key == 'Target':
+                    st.markdown(f"**{recs}**")
+                else:
+                    st.markdown(f"*{key}*")
+                    for rec in recs:
+                        st.write(f"- {rec}")
+
+rerun_timer.lap('scenarios')
+
+if profiler is not None:
+    profiler.disable()
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(40)
+    st.session_state.profile_report = report.getvalue()
+    rerun_timer.lap('profiler')
+
+# Pemakaian memori sesi ini dicatat untuk laporan admin dan /metrics
+script_ctx = get_script_run_ctx()
+SESSION_MEMORY.update(script_ctx.session_id if script_ctx else 'lokal', session_usage(st.session_state))
+rerun_timer.lap('session_memory')
+
+# Panel admin, hanya tampil dengan ?admin=<OBESITAS_ADMIN_TOKEN>
+if is_admin:
+    with st.sidebar:
+        st.markdown('<div class="section-header">Admin</div>', unsafe_allow_html=True)
+        cache_stats = ANALYSIS_CACHE.stats()
+        col_hits, col_misses = st.columns(2)
+        col_hits.metric("Cache Hit", cache_stats['hits'])
+        col_misses.metric("Cache Miss", cache_stats['misses'])
+        st.caption(f"Hit rate {cache_stats['hit_rate']:.1%} · {cache_stats['size']}/{cache_stats['maxsize']} entri · TTL {cache_stats['ttl']:.0f} detik")
+        st.json(cache_stats, expanded=False)
+        if st.button("Kosongkan Cache Analisis"):
+            ANALYSIS_CACHE.clear()
+
+        # Rincian waktu per fase rerun (rerun saat ini belum termasuk)
+        st.markdown('<div class="section-header">Waktu Rerun</div>', unsafe_allow_html=True)
+        st.caption(f"{REGISTRY.reruns} rerun tercatat")
+        st.dataframe(
+            [{'fase': phase, **stats} for phase, stats in sorted(REGISTRY.summary().items())],
+            hide_index=True
+        )
+        recent_reruns = REGISTRY.recent()[:20]
+        if recent_reruns:
+            st.dataframe(
+                [{'waktu': r['time'], 'total_ms': r['total_ms'], **r['phases_ms']} for r in recent_reruns],
+                hide_index=True
+            )
+        # Memori per sesi aktif; aset read-only (model, indeks, figure) dibagi per proses
+        st.markdown('<div class="section-header">Memori Sesi</div>', unsafe_allow_html=True)
+        memory_totals = SESSION_MEMORY.totals()
+        col_sessions, col_memory = st.columns(2)
+        col_sessions.metric("Sesi Aktif", memory_totals['sessions'])
+        col_memory.metric("Total (MB)", f"{memory_totals['session_memory_bytes'] / 2**20:.2f}")
+        st.caption(f"Batas per sesi {SESSION_MEMORY_LIMIT / 2**20:.1f} MB · {len(FIGURE_CACHE)} figure hasil dibagi antar sesi")
+        st.dataframe(
+            [{'sesi': row['session'], 'MB': round(row['bytes'] / 2**20, 3), 'idle (s)': row['idle_s']}
+             for row in SESSION_MEMORY.snapshot()[:20]],
+            hide_index=True
+        )
+
+        if st.button("Profil Rerun Berikutnya"):
+            st.session_state.profile_next_rerun = True
+            st.caption("Rerun berikutnya akan diprofil dengan cProfile.")
+        if 'profile_report' in st.session_state:
+            with st.expander("Hasil cProfile Terakhir"):
+                st.code(st.session_state.profile_report)
+        rerun_timer.lap('admin')
+
+rerun_timer.finish()
@@ -0,0 +1,35 @@
+"""Logika inti sistem analisis obesitas, terpisah dari antarmuka Streamlit.
+
+Atribut paket dimuat secara lazy: ``from obesitas import calculate_metrics``
+tidak mengimpor numpy, pandas, plotly, maupun streamlit.
+"""
+import importlib
+
+# Nama publik -> submodul yang mendefinisikannya
+_EXPORTS = {
+    'calculate_metrics': 'metrics',
+    'calculate_metrics_batch': 'metrics',
+    'generate_recommendations': 'recommendations',
+    'generate_recommendations_batch': 'recommendations',
+    'AnalysisResult': 'analysis',
+    'analyze': 'analysis',
+    'ObesityModel': 'model',
+    'load_or_train_model': 'model',
+    'predict': 'model',
+    'predict_batch': 'model',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,92 @@
+import hashlib
+from typing import NamedTuple
+
+from .cache import TTLCache
+from .charts import bmi_scale_spec, figure_from_spec
+from .config import ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL
+from .metrics import calculate_metrics
+from .recommendations import generate_recommendations
+
+# Field formulir yang menentukan hasil analisis (nama tidak termasuk)
+PROFILE_FIELDS = [
+    'gender', 'age', 'height', 'weight', 'family_history', 'FAVC', 'FCVC', 'NCP',
+    'CAEC', 'SMOKE', 'CH2O', 'SCC', 'FAF', 'TUE', 'CALC', 'MTRANS',
+]
+
+# Field yang direkomendasikan berdasarkan isian formulir
+RECOMMENDATION_FIELDS = ['FAF', 'TUE', 'SMOKE', 'CH2O', 'FAVC', 'FCVC', 'NCP', 'CAEC']
+
+
+class AnalysisResult(NamedTuple):
+    bmi: float
+    bmr: float
+    category: str
+    color: str
+    recommendations: dict
+    figure_spec: dict
+    prediction: str = None
+    prediction_proba: float = None
+
+
+class ResultState(NamedTuple):
+    """Hasil satu submit yang disimpan di session; rerun lain hanya merender ulang dari sini."""
+    fingerprint: str
+    analysis: AnalysisResult
+    # Turunan yang juga hanya bergantung pada isian: persentil dan profil serupa
+    rank: object = None
+    neighbors: tuple = ()
+    # Isian formulir, dasar simulasi skenario
+    profile: dict = None
+
+
+ANALYSIS_CACHE = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+# Figure hasil per sidik jari isian, dibagi antar sesi alih-alih disalin ke setiap session state
+FIGURE_CACHE = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return value
+    # Angka tidak dibulatkan: kunci yang sama harus berarti hasil yang sama persis
+    return float(value)
+
+
+# Fungsi untuk membuat kunci cache dari isian formulir
+def profile_key(profile: dict) -> tuple:
+    return tuple(_normalize(profile.get(field)) for field in PROFILE_FIELDS)
+
+
+# Fungsi untuk membuat sidik jari isian formulir; isian sama -> hasil analisis sama
+def profile_fingerprint(profile: dict) -> str:
+    return hashlib.blake2b(repr(profile_key(profile)).encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Fungsi untuk menjalankan seluruh analisis untuk satu profil (tanpa cache)
+def run_analysis(profile: dict, model=None, with_figure: bool = True) -> AnalysisResult:
+    bmi, bmr, category, color = calculate_metrics(profile['weight'], profile['height'], profile['age'], profile['gender'])
+    recommendations = generate_recommendations(category, {field: profile[field] for field in RECOMMENDATION_FIELDS})
+    prediction = prediction_proba = None
+    if model is not None:
+        from .model import predict
+
+        prediction, prediction_proba = predict(model, profile)
+    figure_spec = bmi_scale_spec(bmi, color) if with_figure else None
+    return AnalysisResult(bmi, bmr, category, color, recommendations, figure_spec, prediction, prediction_proba)
+
+
+# Fungsi untuk mengambil figure hasil yang dibagi antar sesi (read-only)
+def result_figure(result: ResultState):
+    return FIGURE_CACHE.get_or_compute(result.fingerprint, lambda: figure_from_spec(result.analysis.figure_spec))
+
+
+# Fungsi untuk analisis dengan cache LRU+TTL per profil
+def analyze(profile: dict, model=None, cache: TTLCache = ANALYSIS_CACHE, with_figure: bool = True) -> AnalysisResult:
+    """Hasilnya dibagi antar pemanggil; perlakukan sebagai read-only."""
+    key = profile_key(profile)
+    # Angka di kunci tidak dibulatkan, jadi analisis atas isian ternormalisasi sama dengan isian asli
+    normalized = dict(zip(PROFILE_FIELDS, key))
+    return cache.get_or_compute((key, model is not None, with_figure), lambda: run_analysis(normalized, model, with_figure))
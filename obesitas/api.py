@@ -0,0 +1,270 @@
+"""API HTTP tanpa Streamlit/Plotly untuk menilai profil dari layanan lain.
+
+Jalankan dengan ``python -m obesitas.api --port 8000 --workers 16``.
+
+Endpoint:
+    GET  /health        status server
+    GET  /metrics       waktu per endpoint dalam format teks Prometheus
+    POST /score         satu profil (objek JSON berisi 16 field formulir)
+    POST /score/batch   {"profiles": [...]} atau array profil, dinilai secara vektor
+"""
+import argparse
+import json
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pandas as pd
+
+from .analysis import PROFILE_FIELDS, analyze
+from .bulk import LABEL_MAP
+from .metrics import calculate_metrics_batch
+from .model import load_or_train_model, predict_batch
+from .recommendations import DIET_KEY, EXERCISE_KEY, LIFESTYLE_KEY, TARGET_KEY, generate_recommendations_batch
+from .timing import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = ['age', 'height', 'weight', 'FCVC', 'CH2O', 'TUE']
+# Field pilihan bernomor di formulir disimpan sebagai string ("1", "2", ...)
+CODED_FIELDS = ['NCP', 'FAF']
+# Pilihan formulir untuk field bernomor
+CODED_OPTIONS = {
+    'NCP': {'1', '2', '3', '4'},
+    'FAF': {'1', '2', '3'},
+}
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH_SIZE = 100_000
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Fungsi untuk memvalidasi dan menyeragamkan tipe satu profil
+def coerce_profile(profile) -> dict:
+    if not isinstance(profile, dict):
+        raise ApiError(400, "Profil harus berupa objek JSON")
+    missing = [field for field in PROFILE_FIELDS if profile.get(field) in (None, "")]
+    if missing:
+        raise ApiError(400, f"Field wajib belum diisi: {', '.join(missing)}")
+
+    coerced = {field: profile[field] for field in PROFILE_FIELDS}
+    try:
+        for field in NUMERIC_FIELDS + CODED_FIELDS:
+            value = float(coerced[field])
+            # inf/nan (mis. "inf" atau 1e400) lolos float() tetapi tidak bermakna sebagai isian
+            if not math.isfinite(value):
+                raise ValueError(field)
+            if field in CODED_FIELDS:
+                # Kode pecahan (mis. 2.5) tidak ada di pilihan formulir
+                if not value.is_integer() or str(int(value)) not in CODED_OPTIONS[field]:
+                    raise ValueError(field)
+                value = str(int(value))
+            coerced[field] = value
+    except (TypeError, ValueError, OverflowError):
+        raise ApiError(400, f"Field numerik tidak valid: {field}") from None
+    coerced['age'] = int(coerced['age'])
+    if coerced['height'] <= 0:
+        raise ApiError(400, "Tinggi badan harus lebih dari 0")
+    if coerced['weight'] <= 0:
+        raise ApiError(400, "Berat badan harus lebih dari 0")
+
+    # Label dataset (mis. "Male") diterjemahkan dulu; label lain harus sama dengan pilihan formulir
+    for field, mapping in LABEL_MAP.items():
+        value = coerced[field]
+        if isinstance(value, str):
+            value = mapping.get(value, value)
+        if value not in mapping.values():
+            raise ApiError(400, f"Pilihan tidak valid untuk {field}: {coerced[field]!r}")
+        coerced[field] = value
+    return coerced
+
+
+def _result_to_json(result) -> dict:
+    return {
+        'bmi': round(result.bmi, 2),
+        'bmr': round(result.bmr, 2),
+        'category': result.category,
+        'color': result.color,
+        'prediction': result.prediction,
+        'prediction_proba': result.prediction_proba,
+        'recommendations': result.recommendations,
+    }
+
+
+class ScoringService:
+    """Logika endpoint, terpisah dari HTTP agar mudah dipakai ulang."""
+
+    def __init__(self, model=None):
+        self.model = model
+
+    def score(self, payload) -> dict:
+        profile = coerce_profile(payload)
+        return _result_to_json(analyze(profile, self.model, with_figure=False))
+
+    def score_batch(self, payload) -> dict:
+        profiles = payload.get('profiles') if isinstance(payload, dict) else payload
+        if not isinstance(profiles, list):
+            raise ApiError(400, "Body harus berupa array profil atau {\"profiles\": [...]}")
+        if len(profiles) > MAX_BATCH_SIZE:
+            raise ApiError(413, f"Maksimal {MAX_BATCH_SIZE} profil per permintaan")
+        if not profiles:
+            return {'results': []}
+
+        coerced = []
+        for i, profile in enumerate(profiles):
+            try:
+                coerced.append(coerce_profile(profile))
+            except ApiError as err:
+                raise ApiError(err.status, f"Profil #{i}: {err.message}") from None
+        df = pd.DataFrame(coerced, columns=PROFILE_FIELDS)
+        scores = calculate_metrics_batch(df)
+        recommendations = generate_recommendations_batch(scores['category'], df)
+        if self.model is not None:
+            predictions, probas = predict_batch(self.model, df)
+        else:
+            predictions = probas = [None] * len(df)
+
+        results = []
+        for i, (bmi, bmr, category, color) in enumerate(scores.itertuples(index=False)):
+            results.append({
+                'bmi': round(bmi, 2),
+                'bmr': round(bmr, 2),
+                'category': category,
+                'color': color,
+                'prediction': predictions[i],
+                'prediction_proba': None if probas[i] is None else float(probas[i]),
+                'recommendations': {
+                    DIET_KEY: list(recommendations[DIET_KEY].iat[i]),
+                    EXERCISE_KEY: list(recommendations[EXERCISE_KEY].iat[i]),
+                    LIFESTYLE_KEY: list(recommendations[LIFESTYLE_KEY].iat[i]),
+                    TARGET_KEY: recommendations[TARGET_KEY].iat[i],
+                },
+            })
+        return {'results': results}
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ObesitasAPI/1.0"
+    # Koneksi keep-alive yang menganggur dilepas agar worker tidak tertahan
+    timeout = 30
+    # Header dan body dikirim terpisah; tanpa TCP_NODELAY tiap respons tertahan delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    routes = {
+        '/score': 'score',
+        '/score/batch': 'score_batch',
+    }
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_text(self, status: int, text: str) -> None:
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'model': self.server.service.model is not None})
+        elif self.path == '/metrics':
+            self._send_text(200, REGISTRY.prometheus_text())
+        else:
+            self._send_json(404, {'error': 'Endpoint tidak ditemukan'})
+
+    def do_POST(self):
+        method = self.routes.get(self.path)
+        if method is None:
+            self._send_json(404, {'error': 'Endpoint tidak ditemukan'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                raise ApiError(413, "Body terlalu besar")
+            try:
+                payload = json.loads(self.rfile.read(length) or b'null')
+            except ValueError:
+                raise ApiError(400, "Body bukan JSON yang valid") from None
+            started = time.perf_counter()
+            result = getattr(self.server.service, method)(payload)
+            REGISTRY.observe(f"api_{method}", time.perf_counter() - started)
+            self._send_json(200, result)
+        except ApiError as err:
+            self._send_json(err.status, {'error': err.message})
+        except Exception:
+            logger.exception("Gagal memproses %s", self.path)
+            self._send_json(500, {'error': 'Terjadi kesalahan internal'})
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer yang melayani koneksi dari thread pool berukuran tetap."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, service: ScoringService, workers: int = 16):
+        super().__init__(server_address, handler_class)
+        self.service = service
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="obesitas-api")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8000, workers: int = 16, model=None) -> PooledHTTPServer:
+    return PooledHTTPServer((host, port), ScoringHandler, ScoringService(model), workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API penilaian obesitas")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--no-model', action='store_true', help="Lewati prediksi model klasifikasi")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    model = None if args.no_model else load_or_train_model()
+    server = create_server(args.host, args.port, args.workers, model)
+    logger.info("API berjalan di http://%s:%d dengan %d worker", args.host, args.port, args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import contextlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import BULK_RESULT_DIR, BULK_RESULT_TTL
+from .metrics import calculate_metrics_batch
+from .percentiles import load_percentile_index
+from .recommendations import DIET_KEY, EXERCISE_KEY, LIFESTYLE_KEY, TARGET_KEY, generate_recommendations_batch
+
+# Jumlah baris per chunk saat membaca file besar
+CHUNK_ROWS = 50_000
+
+# Nama kolom dataset (bahasa Inggris) -> nama kolom di aplikasi
+COLUMN_MAP = {
+    'Gender': 'gender',
+    'Age': 'age',
+    'Height': 'height',
+    'Weight': 'weight',
+    'family_history_with_overweight': 'family_history',
+}
+
+_YES_NO = {'yes': 'ya', 'no': 'tidak'}
+_FREQUENCY = {'no': 'Tidak Pernah', 'Sometimes': 'Kadang', 'Frequently': 'Sering', 'Always': 'Selalu'}
+
+# Label dataset -> label yang dipakai di formulir aplikasi
+LABEL_MAP = {
+    'gender': {'Male': 'Laki-laki', 'Female': 'Perempuan'},
+    'family_history': _YES_NO,
+    'FAVC': _YES_NO,
+    'SMOKE': _YES_NO,
+    'SCC': _YES_NO,
+    'CAEC': _FREQUENCY,
+    'CALC': _FREQUENCY,
+    'MTRANS': {
+        'Automobile': 'Mobil',
+        'Motorbike': 'Motor',
+        'Bike': 'Sepeda',
+        'Public_Transportation': 'Transportasi Publik',
+        'Walking': 'Jalan Kaki',
+    },
+}
+
+SCORE_COLUMNS = ['bmi', 'bmr', 'category', 'color', 'bmi_percentile', 'bmr_percentile']
+
+# Kolom rekomendasi pada file hasil
+RECOMMENDATION_COLUMNS = {
+    TARGET_KEY: 'target',
+    DIET_KEY: 'rekomendasi_diet',
+    EXERCISE_KEY: 'rekomendasi_olahraga',
+    LIFESTYLE_KEY: 'rekomendasi_gaya_hidup',
+}
+
+
+# Fungsi untuk menerjemahkan label dataset ke label aplikasi
+def translate_labels(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns=COLUMN_MAP)
+    for col, mapping in LABEL_MAP.items():
+        if col not in df.columns:
+            continue
+        # Label yang sudah berbahasa Indonesia atau tidak dikenal dibiarkan apa adanya
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.rename_categories(lambda label: mapping.get(label, label))
+        else:
+            df[col] = df[col].map(mapping).fillna(df[col])
+    return df
+
+
+# Fungsi untuk mengubah skala dataset ke skala formulir (kebalikan model.form_to_features)
+def to_form_scale(df: pd.DataFrame) -> pd.DataFrame:
+    """Kode dataset lebih kasar daripada isian formulir, jadi sebagian aturan rekomendasi terbatas.
+
+    - CH2O: kode 1 (< 1 L), 2 (1-2 L), 3 (> 2 L) dipakai langsung sebagai liter,
+      sama seperti form_to_features yang memotong liter ke 1-3. Aturan "air < 2 L"
+      hanya berlaku untuk kode < 2; baris berkode 2 (1-2 L) dianggap cukup.
+    - TUE: kode 0 (0-2 jam), 1 (3-5 jam), 2 (> 5 jam) dipetakan ke 2, 4, 5 jam.
+      Dataset tidak membedakan screen time di atas 5 jam, sehingga aturan
+      "screen time > 8 jam" tidak pernah berlaku untuk baris unggahan.
+    """
+    form = pd.DataFrame(index=df.index)
+    for col in ('FAVC', 'FCVC', 'CAEC', 'SMOKE', 'CH2O'):
+        if col in df.columns:
+            form[col] = df[col]
+    if 'NCP' in df.columns:
+        form['NCP'] = np.clip(np.round(df['NCP'].to_numpy(dtype=np.float64)), 1, 4).astype(int).astype(str)
+    if 'FAF' in df.columns:
+        form['FAF'] = (np.clip(np.round(df['FAF'].to_numpy(dtype=np.float64) / 1.5), 0, 2) + 1).astype(int).astype(str)
+    if 'TUE' in df.columns:
+        form['TUE'] = np.interp(df['TUE'].to_numpy(dtype=np.float64), [0, 1, 2], [2, 4, 5])
+    return form
+
+
+# Fungsi untuk menilai satu chunk
+def score_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    df = translate_labels(df)
+    scores = calculate_metrics_batch(df)
+    df['bmi'] = scores['bmi'].round(2)
+    df['bmr'] = scores['bmr'].round(2)
+    df['category'] = scores['category']
+    df['color'] = scores['color']
+
+    # Persentil terhadap populasi referensi seusia dan sejenis kelamin
+    index = load_percentile_index()
+    for metric in ('bmi', 'bmr'):
+        df[f'{metric}_percentile'] = index.percentile_batch(metric, df['gender'], df['age'], scores[metric]).round(1)
+
+    recommendations = generate_recommendations_batch(scores['category'], to_form_scale(df), sep='; ')
+    for key, col in RECOMMENDATION_COLUMNS.items():
+        df[col] = recommendations[key]
+    return df
+
+
+# Generator chunk yang sudah dinilai; memori hanya sebesar satu chunk
+def iter_scored_chunks(source, chunksize: int = CHUNK_ROWS):
+    with pd.read_csv(source, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield score_chunk(chunk)
+
+
+# Fungsi untuk menilai file CSV dan menulis hasilnya secara bertahap
+def score_csv(source, dest, chunksize: int = CHUNK_ROWS, total_bytes: int = None, progress=None) -> int:
+    """Baca `source` per chunk, nilai, lalu tulis ke `dest` (path atau file).
+
+    `progress(rows, fraction)` dipanggil setelah setiap chunk; `fraction`
+    diperkirakan dari posisi baca jika `total_bytes` diketahui.
+    Mengembalikan jumlah baris yang diproses.
+    """
+    rows = 0
+    header = True
+    for chunk in iter_scored_chunks(source, chunksize):
+        chunk.to_csv(dest, index=False, header=header, mode='w' if header else 'a')
+        header = False
+        rows += len(chunk)
+        if progress is not None:
+            fraction = None
+            if total_bytes and hasattr(source, 'tell'):
+                fraction = min(source.tell() / total_bytes, 1.0)
+            progress(rows, fraction)
+    return rows
+
+
+# Fungsi untuk membuat file hasil baru di direktori hasil unggahan
+def new_result_path(directory: str = BULK_RESULT_DIR) -> str:
+    import tempfile
+
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".csv.gz")
+    os.close(fd)
+    return path
+
+
+# Fungsi untuk menghapus file hasil dari sesi yang sudah lama ditinggalkan
+def remove_stale_results(directory: str = BULK_RESULT_DIR, max_age: float = BULK_RESULT_TTL) -> int:
+    """Mengembalikan jumlah file yang dihapus."""
+    cutoff = time.time() - max_age
+    removed = 0
+    with contextlib.suppress(FileNotFoundError):
+        for entry in os.scandir(directory):
+            # Proses lain bisa sudah menghapusnya lebih dulu
+            with contextlib.suppress(FileNotFoundError):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+    return removed
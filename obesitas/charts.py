@@ -0,0 +1,106 @@
+import copy
+import json
+from functools import lru_cache
+
+# plotly hanya diimpor saat figure dibangun, agar modul ini bisa dipakai tanpa plotly
+
+# Definisikan batas-batas BMI dan warna
+BMI_RANGES = [
+    {'max': 18.5, 'color': '#ff6b6b', 'label': 'Kurang'},
+    {'max': 25, 'color': '#51cf66', 'label': 'Normal'},
+    {'max': 30, 'color': '#ffd43b', 'label': 'Berlebih'},
+    {'max': 40, 'color': '#fa5252', 'label': 'Obesitas'},
+    {'max': float('inf'), 'color': '#fa5252', 'label': 'Obesitas'}
+]
+
+
+# Skala BMI statis, dibangun sekali per proses
+@lru_cache(maxsize=1)
+def bmi_scale_base() -> dict:
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Tambahkan area untuk setiap rentang BMI
+    for i, range_info in enumerate(BMI_RANGES):
+        fig.add_trace(go.Scatter(
+            x=[0 if i == 0 else BMI_RANGES[i-1]['max'], range_info['max']],
+            y=[0, 0],
+            mode='lines',
+            line=dict(color=range_info['color'], width=10),
+            name=range_info['label']
+        ))
+
+    # Tambahkan marker untuk label
+    fig.add_trace(go.Scatter(
+        x=[0, 18.5, 25, 30, 40],
+        y=[0, 0, 0, 0, 0],
+        mode='markers+text',
+        text=['', 'Kurang', 'Normal', 'Berlebih', 'Obesitas'],
+        textposition='bottom center',
+        marker=dict(
+            size=20,
+            color=['#ff6b6b', '#51cf66', '#ffd43b', '#fa5252', '#fa5252'],
+        )
+    ))
+
+    fig.update_layout(
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=False, title='BMI'),
+        yaxis=dict(showgrid=False, showticklabels=False),
+        height=200,
+        margin=dict(l=20, r=20, t=20, b=40)
+    )
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=1)
+def bmi_scale_base_json() -> str:
+    import plotly.io as pio
+
+    return pio.to_json(bmi_scale_base(), validate=False)
+
+
+# Garis vertikal BMI pengguna; setara dengan fig.add_vline(..., annotation_position="top right")
+def bmi_marker_layout(bmi: float, color: str) -> dict:
+    return {
+        'shapes': [{
+            'type': 'line', 'x0': bmi, 'x1': bmi, 'xref': 'x',
+            'y0': 0, 'y1': 1, 'yref': 'y domain',
+            'line': {'color': color, 'dash': 'dash'},
+        }],
+        'annotations': [{
+            'text': f"BMI Anda: {bmi:.2f}", 'showarrow': False,
+            'x': bmi, 'xref': 'x', 'xanchor': 'left',
+            'y': 1, 'yref': 'y domain', 'yanchor': 'top',
+        }],
+    }
+
+
+# Spesifikasi skala BMI lengkap dengan marker pengguna
+def bmi_scale_spec(bmi: float, color: str) -> dict:
+    spec = copy.deepcopy(bmi_scale_base())
+    spec['layout'].update(bmi_marker_layout(bmi, color))
+    return spec
+
+
+def bmi_scale_json(bmi: float, color: str) -> str:
+    # Sisipkan marker ke JSON statis tanpa serialisasi ulang seluruh figure
+    base = bmi_scale_base_json()
+    marker = json.dumps(bmi_marker_layout(bmi, color))[1:-1]
+    layout_start = base.index('"layout":{') + len('"layout":{')
+    return f"{base[:layout_start]}{marker},{base[layout_start:]}"
+
+
+# Figure dari spesifikasi yang sudah valid; validasi dilewati dan spec disalin oleh go.Figure
+def figure_from_spec(spec: dict):
+    import plotly.graph_objects as go
+
+    return go.Figure(spec, _validate=False)
+
+
+# Figure skala BMI untuk st.plotly_chart
+def bmi_scale_figure(bmi: float, color: str):
+    return figure_from_spec(bmi_scale_spec(bmi, color))
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(BASE_DIR, "ObesityDataSet_raw_and_data_sinthetic.csv")
+MODEL_DIR = os.environ.get("OBESITAS_MODEL_DIR", os.path.join(BASE_DIR, "models"))
+DATASET_CACHE_DIR = os.environ.get("OBESITAS_DATASET_CACHE_DIR", os.path.join(BASE_DIR, "data", "cache"))
+HISTORY_DB_PATH = os.environ.get("OBESITAS_HISTORY_DB", os.path.join(BASE_DIR, "data", "history.db"))
+# Riwayat pemilik yang tidak aktif lebih lama dari ini (hari) dihapus; 0 menonaktifkan
+HISTORY_RETENTION_DAYS = float(os.environ.get("OBESITAS_HISTORY_RETENTION_DAYS", "90"))
+# File hasil unggahan CSV; file yang lebih tua dari TTL (detik) dianggap milik sesi yang sudah ditutup
+BULK_RESULT_DIR = os.environ.get("OBESITAS_BULK_RESULT_DIR", os.path.join(tempfile.gettempdir(), "obesitas-bulk"))
+BULK_RESULT_TTL = float(os.environ.get("OBESITAS_BULK_RESULT_TTL", "86400"))
+
+# Cache hasil analisis per profil
+ANALYSIS_CACHE_SIZE = int(os.environ.get("OBESITAS_ANALYSIS_CACHE_SIZE", "1024"))
+ANALYSIS_CACHE_TTL = float(os.environ.get("OBESITAS_ANALYSIS_CACHE_TTL", "3600"))
+
+# Batas memori state per sesi (MB); riwayat sesi terlama dibuang bila terlampaui
+SESSION_MEMORY_LIMIT = int(float(os.environ.get("OBESITAS_SESSION_MEMORY_MB", "8")) * 1024 * 1024)
+
+# Token untuk panel admin (?admin=<token>); panel tidak tampil jika kosong
+ADMIN_TOKEN = os.environ.get("OBESITAS_ADMIN_TOKEN", "")
+
+# Endpoint Prometheus /metrics untuk waktu per fase rerun; nonaktif jika 0
+METRICS_PORT = int(os.environ.get("OBESITAS_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("OBESITAS_METRICS_HOST", "127.0.0.1")
+# Tulis ringkasan waktu setiap rerun sebagai log JSON
+TIMING_LOG = os.environ.get("OBESITAS_TIMING_LOG", "") not in ("", "0")
@@ -0,0 +1,112 @@
+"""Cache kolumnar bertipe untuk dataset referensi.
+
+CSV dikonversi sekali menjadi file Feather (Arrow IPC) tanpa kompresi:
+kolom teks berkardinalitas rendah menjadi categorical (dictionary Arrow) dan
+kolom float menjadi float32. Pemanggilan berikutnya membaca cache tersebut,
+bisa hanya kolom tertentu, dan ``load_table`` membacanya lewat memory map
+sehingga buffer Arrow tidak disalin.
+"""
+from __future__ import annotations
+
+import contextlib
+import glob
+import os
+import tempfile
+from typing import TYPE_CHECKING
+
+from .config import DATASET_CACHE_DIR, DATASET_PATH
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Naikkan jika aturan konversi tipe berubah
+CACHE_VERSION = 1
+
+# Kolom teks dataset bawaan; kolom teks lain menjadi categorical jika nilai uniknya sedikit
+CATEGORICAL_COLUMNS = (
+    'Gender', 'family_history_with_overweight', 'FAVC', 'CAEC', 'SMOKE',
+    'SCC', 'CALC', 'MTRANS', 'NObeyesdad',
+)
+CATEGORY_MAX_RATIO = 0.5
+
+# float32 (~7 digit signifikan) cukup untuk pohon keputusan sklearn (yang memakai
+# float32 secara internal), persentil, dan grafik
+FLOAT32_MAX = 3.4e38
+
+
+# Fungsi untuk menentukan tipe kolom hasil konversi
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            if np.all(np.abs(values[np.isfinite(values)]) < FLOAT32_MAX):
+                df[col] = series.astype(np.float32)
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            if col in CATEGORICAL_COLUMNS or series.nunique() <= CATEGORY_MAX_RATIO * max(len(series), 1):
+                df[col] = series.astype('category')
+    return df
+
+
+# Fungsi untuk menentukan path cache dari ukuran dan waktu ubah file sumber
+def cache_path(path: str = DATASET_PATH, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    stat = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-v{CACHE_VERSION}-{stat.st_size:x}-{stat.st_mtime_ns:x}.feather")
+
+
+# Fungsi untuk mengonversi CSV ke cache Feather (sekali per versi file)
+def build_cache(path: str = DATASET_PATH, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    dest = cache_path(path, cache_dir)
+    if os.path.exists(dest):
+        return dest
+
+    os.makedirs(cache_dir, exist_ok=True)
+    table = pa.Table.from_pandas(optimize_dtypes(pd.read_csv(path)), preserve_index=False)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        # Tanpa kompresi agar file bisa di-memory-map tanpa dekompresi
+        feather.write_feather(table, tmp, compression='uncompressed')
+        os.replace(tmp, dest)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    # Hapus cache lama dari file yang sama
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{stem}-v*.feather")):
+        if stale != dest:
+            # Worker lain (mis. pipeline) bisa menghapus file yang sama lebih dulu
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stale)
+    return dest
+
+
+# Fungsi untuk membaca dataset sebagai tabel Arrow (zero-copy lewat memory map)
+def load_table(path: str = DATASET_PATH, columns=None, cache_dir: str = DATASET_CACHE_DIR) -> pa.Table:
+    """Buffer tabel menunjuk langsung ke file cache; tetap valid selama tabel dipakai."""
+    import pyarrow.feather as feather
+
+    return feather.read_table(build_cache(path, cache_dir), columns=columns, memory_map=True)
+
+
+# Fungsi untuk membaca dataset sebagai DataFrame bertipe
+def load_dataset(path: str = DATASET_PATH, columns=None, cache_dir: str = DATASET_CACHE_DIR) -> pd.DataFrame:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # Tanpa pyarrow: tetap bertipe, tetapi CSV diparse ulang setiap kali
+        import pandas as pd
+
+        return optimize_dtypes(pd.read_csv(path, usecols=columns))
+    return load_table(path, columns, cache_dir).to_pandas()
@@ -0,0 +1,96 @@
+import gzip
+import io
+
+# Label format -> (ekstensi file, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+# Fungsi untuk mengecek dependensi opsional per format
+def available_formats() -> list:
+    formats = ['CSV', 'CSV (gzip)']
+    try:
+        import pyarrow  # noqa: F401
+        formats.append('Parquet')
+    except ImportError:
+        pass
+    return formats
+
+
+def _write_csv(chunks, raw, columns: dict = None) -> None:
+    text = io.TextIOWrapper(raw, encoding='utf-8', newline='', write_through=True)
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(text, index=False, header=header)
+        header = False
+    if header and columns:
+        # Tanpa baris, tetap tulis header agar file bisa dibaca
+        text.write(','.join(columns) + '\n')
+    text.detach()
+
+
+# Tipe kolom SQLite -> tipe Arrow
+def _arrow_schema(columns: dict):
+    import pyarrow as pa
+
+    types = {'TEXT': pa.string(), 'REAL': pa.float64(), 'INTEGER': pa.int64()}
+    return pa.schema([(name, types[kind.split()[0]]) for name, kind in columns.items()])
+
+
+def _write_parquet(chunks, raw, columns: dict = None) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Skema tetap dari `columns`; jika ditebak dari chunk pertama, chunk berikutnya
+    # dengan kolom yang seluruhnya kosong atau bertipe lain gagal ditulis
+    schema = _arrow_schema(columns) if columns else None
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(raw, table.schema, compression='snappy')
+            # Setiap chunk menjadi satu row group
+            writer.write_table(table)
+        if writer is None:
+            # Tanpa baris tetap ditulis file Parquet yang valid (0 baris)
+            writer = pq.ParquetWriter(raw, schema if schema is not None else pa.schema([]), compression='snappy')
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# Fungsi untuk menulis chunk DataFrame ke file dalam format tertentu
+def write_export(chunks, fmt: str, dest, columns: dict = None) -> None:
+    """Tulis iterable DataFrame `chunks` ke file biner `dest` satu chunk demi satu chunk.
+
+    `columns` (nama kolom -> tipe SQLite) menetapkan skema file, juga saat tidak ada baris.
+    """
+    if fmt == 'CSV':
+        _write_csv(chunks, dest, columns)
+    elif fmt == 'CSV (gzip)':
+        with gzip.GzipFile(fileobj=dest, mode='wb') as compressed:
+            _write_csv(chunks, compressed, columns)
+    elif fmt == 'Parquet':
+        _write_parquet(chunks, dest, columns)
+    else:
+        raise ValueError(f"Format export tidak dikenal: {fmt}")
+
+
+# Fungsi untuk membuat file export; dipanggil hanya saat tombol download diklik
+def build_export(chunks, fmt: str, columns: dict = None) -> bytes:
+    output = io.BytesIO()
+    write_export(chunks, fmt, output, columns)
+    # getvalue() berbagi buffer dengan BytesIO, tidak membuat salinan kedua
+    return output.getvalue()
+
+
+def export_file_name(base: str, fmt: str) -> str:
+    return f"{base}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def export_mime(fmt: str) -> str:
+    return EXPORT_FORMATS[fmt][1]
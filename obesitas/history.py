@@ -0,0 +1,334 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .config import HISTORY_DB_PATH, HISTORY_RETENTION_DAYS
+from .timeseries import TrendStats, raw_stats
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Kolom riwayat sesuai urutan yang ditampilkan di tab Riwayat
+HISTORY_COLUMNS = {
+    'timestamp': 'TEXT NOT NULL',
+    'name': 'TEXT NOT NULL',
+    'age': 'INTEGER',
+    'gender': 'TEXT',
+    'height': 'REAL',
+    'weight': 'REAL',
+    'bmi': 'REAL',
+    'bmr': 'REAL',
+    'category': 'TEXT',
+    'prediction': 'TEXT',
+    'FAF': 'TEXT',
+    'TUE': 'REAL',
+    'CH2O': 'REAL',
+    'SMOKE': 'TEXT',
+}
+
+# `owner` adalah pemilik baris (token riwayat di URL); tidak ikut ditampilkan atau di-export.
+# Baris dari database lama tanpa owner hanya terlihat di tampilan admin (owner=None).
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT,
+    {', '.join(f'{col} {kind}' for col, kind in HISTORY_COLUMNS.items())}
+);
+CREATE INDEX IF NOT EXISTS idx_history_name ON history (name);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+-- Agregat BMI harian per pemilik dan nama, diperbarui setiap append
+CREATE TABLE IF NOT EXISTS history_daily (
+    owner TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    bmi_sum REAL NOT NULL,
+    bmi_min REAL NOT NULL,
+    bmi_max REAL NOT NULL,
+    PRIMARY KEY (owner, name, day)
+);
+"""
+
+# Index owner dibuat setelah migrasi agar database lama sudah punya kolomnya
+_OWNER_INDEX = "CREATE INDEX IF NOT EXISTS idx_history_owner ON history (owner, timestamp)"
+
+_UPSERT_DAILY = """
+INSERT INTO history_daily (owner, name, day, n, bmi_sum, bmi_min, bmi_max) VALUES (?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (owner, name, day) DO UPDATE SET
+    n = n + 1,
+    bmi_sum = bmi_sum + excluded.bmi_sum,
+    bmi_min = MIN(bmi_min, excluded.bmi_min),
+    bmi_max = MAX(bmi_max, excluded.bmi_max)
+"""
+
+# Isi agregat harian dari riwayat yang sudah ada (database lama)
+_BACKFILL_DAILY = """
+INSERT INTO history_daily (owner, name, day, n, bmi_sum, bmi_min, bmi_max)
+SELECT COALESCE(owner, ''), name, substr(timestamp, 1, 10), COUNT(bmi), SUM(bmi), MIN(bmi), MAX(bmi)
+FROM history WHERE bmi IS NOT NULL GROUP BY COALESCE(owner, ''), name, substr(timestamp, 1, 10)
+"""
+
+
+# Tambahkan kolom owner ke database dari versi sebelumnya
+def _migrate(conn: sqlite3.Connection) -> None:
+    if 'owner' not in {row[1] for row in conn.execute("PRAGMA table_info(history)")}:
+        conn.execute("ALTER TABLE history ADD COLUMN owner TEXT")
+    if 'owner' not in {row[1] for row in conn.execute("PRAGMA table_info(history_daily)")}:
+        # Kunci agregat berubah; bangun ulang dari riwayat mentah
+        conn.execute("DROP TABLE history_daily")
+        conn.executescript(_SCHEMA)
+
+
+# Pemilik yang entri terakhirnya lebih tua dari batas; baris tanpa owner dihitung satu pemilik
+_PURGE_HISTORY = """
+DELETE FROM history WHERE COALESCE(owner, '') IN (
+    SELECT COALESCE(owner, '') FROM history GROUP BY COALESCE(owner, '') HAVING MAX(timestamp) < ?
+)
+"""
+_PURGE_DAILY = "DELETE FROM history_daily WHERE owner NOT IN (SELECT DISTINCT COALESCE(owner, '') FROM history)"
+
+
+# Klausa WHERE untuk filter nama dan pemilik; owner=None berarti semua pemilik (admin)
+def _where(name: str = None, owner: str = None) -> tuple:
+    clauses, params = [], []
+    if owner is not None:
+        clauses.append("owner = ?")
+        params.append(owner)
+    if name:
+        clauses.append("name = ?")
+        params.append(name)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class HistoryStore:
+    """Riwayat analisis persisten di SQLite (mode WAL), dipakai bersama semua sesi.
+
+    Setiap baris dicatat dengan `owner`; kueri dengan `owner` hanya melihat
+    baris pemilik tersebut, tanpa `owner` melihat semuanya (tampilan admin).
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Satu koneksi per proses; Streamlit menjalankan sesi di thread berbeda
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            _migrate(self._conn)
+            self._conn.execute(_OWNER_INDEX)
+            if self._conn.execute("SELECT NOT EXISTS (SELECT 1 FROM history_daily)").fetchone()[0]:
+                self._conn.execute(_BACKFILL_DAILY)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def append(self, record: dict, owner: str = None) -> int:
+        record = dict(record)
+        if isinstance(record.get('timestamp'), datetime):
+            record['timestamp'] = record['timestamp'].strftime(TIMESTAMP_FORMAT)
+        record['owner'] = owner
+        cols = ['owner'] + [col for col in HISTORY_COLUMNS if col in record]
+        sql = f"INSERT INTO history ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+        bmi = record.get('bmi')
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.execute(sql, [record[col] for col in cols])
+                if bmi is not None:
+                    self._conn.execute(_UPSERT_DAILY, (owner or '', record['name'], record['timestamp'][:10], bmi, bmi, bmi))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.lastrowid
+
+    def purge(self, max_age_days: float = HISTORY_RETENTION_DAYS, now: datetime = None) -> int:
+        """Hapus seluruh riwayat pemilik yang tidak aktif selama `max_age_days` hari.
+
+        Pemilik yang masih aktif tetap menyimpan riwayat lamanya. Mengembalikan
+        jumlah baris riwayat yang dihapus.
+        """
+        if max_age_days <= 0:
+            return 0
+        cutoff = ((now or datetime.now()) - timedelta(days=max_age_days)).strftime(TIMESTAMP_FORMAT)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute(_PURGE_HISTORY, (cutoff,)).rowcount
+                if removed:
+                    self._conn.execute(_PURGE_DAILY)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def count(self, name: str = None, owner: str = None) -> int:
+        where, params = _where(name, owner)
+        sql = "SELECT COUNT(*) FROM history" + where
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = 50, name: str = None, owner: str = None) -> pd.DataFrame:
+        """Ambil satu jendela riwayat, terbaru lebih dulu."""
+        where, params = _where(name, owner)
+        sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history" + where
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=list(HISTORY_COLUMNS))
+
+    def daily_trend(self, name: str = None, owner: str = None) -> TrendStats:
+        """Agregat BMI harian dari tabel history_daily, tanpa membaca riwayat mentah."""
+        # history_daily menyimpan owner kosong untuk baris tanpa pemilik
+        where, params = _where(name, None if owner is None else owner or '')
+        sql = "SELECT day, SUM(n), SUM(bmi_sum), MIN(bmi_min), MAX(bmi_max) FROM history_daily" + where
+        sql += " GROUP BY day ORDER BY day"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        days, count, total, minimum, maximum = zip(*rows) if rows else ((),) * 5
+        return TrendStats(
+            np.asarray(days, dtype='datetime64[s]'),
+            np.asarray(count, dtype=np.float64),
+            np.asarray(total, dtype=np.float64),
+            np.asarray(minimum, dtype=np.float64),
+            np.asarray(maximum, dtype=np.float64),
+        )
+
+    def iter_chunks(self, chunk_size: int = 10_000, name: str = None, owner: str = None):
+        """Iterasi seluruh riwayat (terlama lebih dulu) per DataFrame berukuran `chunk_size`."""
+        where, params = _where(name, owner)
+        sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history" + where
+        sql += " ORDER BY timestamp, id"
+        # Koneksi baca terpisah; dengan WAL tidak menahan penulisan dari sesi lain
+        conn = sqlite3.connect(self.path) if self.path != ':memory:' else self._conn
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=list(HISTORY_COLUMNS))
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+
+# Tipe kolom SQLite -> dtype NumPy untuk buffer kolumnar
+_DTYPES = {'REAL': np.float64, 'INTEGER': np.int64}
+# Timestamp disimpan sebagai datetime sungguhan, bukan string strftime
+_COLUMN_DTYPES = {'timestamp': np.dtype('datetime64[s]')}
+
+
+class HistoryBuffer:
+    """Riwayat sesi dalam kolom NumPy yang dialokasikan di awal dan tumbuh dua kali lipat.
+
+    Setiap `append` hanya menulis satu baris ke kolom dan menaikkan `version`;
+    turunan seperti DataFrame, grafik, dan file export disimpan per versi
+    lewat `derived` sehingga rerun tanpa data baru tidak membangun ulang apa pun.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.dtypes = {
+            col: _COLUMN_DTYPES.get(col, _DTYPES.get(kind.split()[0], object))
+            for col, kind in HISTORY_COLUMNS.items()
+        }
+        self._data = {col: np.empty(capacity, dtype=dtype) for col, dtype in self.dtypes.items()}
+        self.capacity = capacity
+        self.size = 0
+        self.version = 0
+        # Jumlah baris lama yang sudah dibuang dari memori (tetap ada di HistoryStore)
+        self.evicted = 0
+        self._derived = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _resize(self, capacity: int, start: int = 0) -> None:
+        """Pindahkan baris [start, size) ke array baru berkapasitas `capacity`."""
+        keep = self.size - start
+        for col, values in self._data.items():
+            resized = np.empty(capacity, dtype=values.dtype)
+            resized[:keep] = values[start:self.size]
+            self._data[col] = resized
+        self.capacity = capacity
+        self.size = keep
+
+    def _grow(self) -> None:
+        self._resize(self.capacity * 2)
+
+    def append(self, record: dict) -> None:
+        if self.size == self.capacity:
+            self._grow()
+        for col, values in self._data.items():
+            value = record.get(col)
+            if value is None and values.dtype != object:
+                value = {'f': np.nan, 'M': np.datetime64('NaT')}.get(values.dtype.kind, 0)
+            values[self.size] = value
+        self.size += 1
+        self.version += 1
+
+    def drop_oldest(self, count: int) -> None:
+        """Buang `count` baris terlama dan kecilkan array agar memorinya benar-benar dilepas."""
+        count = min(count, self.size)
+        if count <= 0:
+            return
+        capacity = 16
+        while capacity < self.size - count:
+            capacity *= 2
+        self._resize(capacity, start=count)
+        self.evicted += count
+        self.version += 1
+        self._derived.clear()
+
+    def clear_derived(self) -> None:
+        self._derived.clear()
+
+    def derived_values(self) -> list:
+        return [value for key, (_, value) in self._derived.items() if key != 'nbytes']
+
+    def nbytes(self) -> int:
+        """Perkiraan memori kolom (termasuk string di kolom object), di-cache per versi."""
+        def measure():
+            total = 0
+            for values in self._data.values():
+                total += values.nbytes
+                if values.dtype == object:
+                    total += sum(sys.getsizeof(value) for value in values[:self.size] if value is not None)
+            return total
+        return self.derived('nbytes', measure)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[name][:self.size]
+
+    def derived(self, key: str, build):
+        """Kembalikan hasil `build()` yang disimpan untuk versi saat ini."""
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        value = build()
+        self._derived[key] = (self.version, value)
+        return value
+
+    def names(self) -> list:
+        return sorted(set(self.column('name')))
+
+    # Titik BMI sesi (opsional satu nama) sebagai TrendStats
+    def trend(self, name: str = None) -> TrendStats:
+        times, bmi = self.column('timestamp'), self.column('bmi')
+        if name:
+            rows = self.column('name') == name
+            times, bmi = times[rows], bmi[rows]
+        return raw_stats(times, bmi)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.derived('frame', lambda: pd.DataFrame({col: self.column(col) for col in self._data}))
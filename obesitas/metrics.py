@@ -0,0 +1,113 @@
+# numpy dan pandas hanya diimpor oleh fungsi batch; calculate_metrics murni Python
+
+# Batas BMI untuk setiap kategori (batas bawah inklusif)
+BMI_BINS = (18.5, 25, 30, 35, 40)
+BMI_CATEGORIES = (
+    "Insufficient Weight",
+    "Normal Weight",
+    "Overweight Level I",
+    "Overweight Level II",
+    "Overweight Level III",
+    "Overweight Level IV",
+)
+BMI_COLORS = (
+    "#ff6b6b",
+    "#51cf66",
+    "#ffd43b",
+    "#fa5252",
+    "#fa5252",
+    "#fa5252",
+)
+
+MALE_LABEL = "Laki-laki"
+
+# Nama kolom default untuk input DataFrame
+DEFAULT_COLUMNS = {
+    'weight': 'weight',
+    'height': 'height',
+    'age': 'age',
+    'gender': 'gender',
+}
+
+
+# Fungsi untuk menghitung BMI, BMR, dan kategori
+def calculate_metrics(weight, height, age, gender):
+    # height * height (bukan height ** 2) agar hasilnya bit-identik dengan versi batch
+    bmi = weight / (height * height)
+
+    if gender == MALE_LABEL:
+        bmr = 88.362 + (13.397 * weight) + (4.799 * height * 100) - (5.677 * age)
+    else:
+        bmr = 447.593 + (9.247 * weight) + (3.098 * height * 100) - (4.330 * age)
+
+    if bmi < 18.5:
+        category = "Insufficient Weight"
+        color = "#ff6b6b"
+    elif 18.5 <= bmi < 25:
+        category = "Normal Weight"
+        color = "#51cf66"
+    elif 25 <= bmi < 30:
+        category = "Overweight Level I"
+        color = "#ffd43b"
+    elif 30 <= bmi < 35:
+        category = "Overweight Level II"
+        color = "#fa5252"
+    elif 35 <= bmi < 40:
+        category = "Overweight Level III"
+        color = "#fa5252"
+    else:
+        category = "Overweight Level IV"
+        color = "#fa5252"
+
+    return bmi, bmr, category, color
+
+
+# Indeks kategori BMI; NaN ikut ke kategori terakhir seperti cabang else di atas
+def bmi_category_index(bmi):
+    import numpy as np
+
+    return np.searchsorted(np.asarray(BMI_BINS, dtype=np.float64), np.asarray(bmi, dtype=np.float64), side='right')
+
+
+# Fungsi untuk menghitung BMI, BMR, dan kategori sekaligus untuk banyak baris
+def calculate_metrics_batch(data=None, *, weight=None, height=None, age=None, gender=None, columns=None):
+    """Versi vektor dari `calculate_metrics`.
+
+    Menerima DataFrame (kolom sesuai `columns`, default `DEFAULT_COLUMNS`)
+    atau array terpisah lewat argumen keyword. Hasilnya DataFrame berkolom
+    bmi, bmr, category, color yang identik dengan fungsi skalar per baris.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if data is not None:
+        cols = {**DEFAULT_COLUMNS, **(columns or {})}
+        index = data.index
+        weight = data[cols['weight']].to_numpy()
+        height = data[cols['height']].to_numpy()
+        age = data[cols['age']].to_numpy()
+        gender = data[cols['gender']].to_numpy()
+    else:
+        index = None
+        if weight is None or height is None or age is None or gender is None:
+            raise ValueError("weight, height, age, dan gender wajib diisi")
+
+    weight = np.asarray(weight, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    is_male = np.asarray(gender) == MALE_LABEL
+
+    bmi = weight / (height * height)
+    bmr = np.where(
+        is_male,
+        88.362 + (13.397 * weight) + (4.799 * height * 100) - (5.677 * age),
+        447.593 + (9.247 * weight) + (3.098 * height * 100) - (4.330 * age),
+    )
+
+    idx = bmi_category_index(bmi)
+    return pd.DataFrame({
+        'bmi': bmi,
+        'bmr': bmr,
+        'category': np.array(BMI_CATEGORIES, dtype=object)[idx],
+        'color': np.array(BMI_COLORS, dtype=object)[idx],
+    }, index=index)
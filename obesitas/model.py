@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .config import DATASET_PATH, MODEL_DIR
+
+# pandas hanya dipakai saat pelatihan dan jalur batch; prediksi satu profil cukup numpy
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Naikkan jika format artefak, fitur, atau hyperparameter berubah
+ARTIFACT_VERSION = 1
+ARTIFACT_PREFIX = "obesity_model"
+
+TARGET = 'NObeyesdad'
+
+# 16 fitur yang dikumpulkan formulir, dengan nama kolom aplikasi
+NUMERIC_FEATURES = ['age', 'height', 'weight', 'FCVC', 'NCP', 'CH2O', 'FAF', 'TUE']
+CATEGORICAL_FEATURES = ['gender', 'family_history', 'FAVC', 'CAEC', 'SMOKE', 'SCC', 'CALC', 'MTRANS']
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Array numerik hutan keputusan yang disimpan sebagai .npy terpisah
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'value', 'roots']
+
+# Label NObeyesdad -> teks yang ditampilkan
+TARGET_LABELS = {
+    'Insufficient_Weight': 'Insufficient Weight',
+    'Normal_Weight': 'Normal Weight',
+    'Overweight_Level_I': 'Overweight Level I',
+    'Overweight_Level_II': 'Overweight Level II',
+    'Obesity_Type_I': 'Obesity Type I',
+    'Obesity_Type_II': 'Obesity Type II',
+    'Obesity_Type_III': 'Obesity Type III',
+}
+
+
+# Fungsi untuk memuat dataset dengan label aplikasi
+def load_training_data(path: str = DATASET_PATH):
+    from .bulk import COLUMN_MAP, translate_labels
+    from .dataset import load_dataset
+
+    source_columns = {app: raw for raw, app in COLUMN_MAP.items()}
+    columns = [source_columns.get(col, col) for col in FEATURES] + [TARGET]
+    df = translate_labels(load_dataset(path, columns=columns))
+    return df[FEATURES], df[TARGET]
+
+
+# Fungsi untuk mengubah skala isian formulir ke skala dataset
+def forms_to_features(forms: pd.DataFrame) -> pd.DataFrame:
+    df = forms[FEATURES].copy()
+    df['FCVC'] = df['FCVC'].astype(float)
+    df['NCP'] = df['NCP'].astype(float)
+    # Formulir: 1 Tidak Pernah, 2 Kadang, 3 Sering; dataset: 0 (tidak pernah) - 3 (4-5 hari)
+    df['FAF'] = (df['FAF'].astype(float) - 1) * 1.5
+    # Formulir dalam liter; dataset: 1 (< 1 L), 2 (1-2 L), 3 (> 2 L)
+    df['CH2O'] = np.clip(df['CH2O'].astype(float), 1, 3)
+    # Formulir dalam jam; dataset: 0 (0-2 jam), 1 (3-5 jam), 2 (> 5 jam)
+    df['TUE'] = np.interp(df['TUE'].astype(float), [2, 4, 5], [0, 1, 2])
+    return df
+
+
+def form_to_features(input_data: dict) -> pd.DataFrame:
+    import pandas as pd
+
+    return forms_to_features(pd.DataFrame([{col: input_data[col] for col in FEATURES}]))
+
+
+# Versi skalar forms_to_features untuk satu isian, dengan hasil yang sama
+def form_to_feature_row(input_data: dict) -> dict:
+    row = {col: input_data[col] for col in FEATURES}
+    row['FCVC'] = float(row['FCVC'])
+    row['NCP'] = float(row['NCP'])
+    row['FAF'] = (float(row['FAF']) - 1) * 1.5
+    row['CH2O'] = min(max(float(row['CH2O']), 1.0), 3.0)
+    row['TUE'] = float(np.interp(float(row['TUE']), [2, 4, 5], [0, 1, 2]))
+    return row
+
+
+# Fungsi untuk menghitung hash dataset sebagai kunci artefak
+def dataset_hash(path: str = DATASET_PATH) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_path(data_hash: str, model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, f"{ARTIFACT_PREFIX}-v{ARTIFACT_VERSION}-{data_hash[:16]}")
+
+
+# Fungsi untuk membangun pipeline klasifikasi
+def build_model():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    preprocess = ColumnTransformer([
+        ('num', 'passthrough', NUMERIC_FEATURES),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+    ])
+    return Pipeline([
+        ('preprocess', preprocess),
+        ('classifier', RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)),
+    ])
+
+
+# Fungsi untuk melatih model dari dataset
+def train_model(path: str = DATASET_PATH):
+    X, y = load_training_data(path)
+    return build_model().fit(X, y)
+
+
+# Fungsi untuk menyimpan pipeline sklearn sebagai artefak array datar
+def export_artifact(pipeline, path: str, data_hash: str) -> None:
+    """Simpan encoder sebagai JSON dan semua pohon sebagai array .npy.
+
+    Node setiap pohon digabung menjadi satu array dengan offset global;
+    daun menunjuk ke dirinya sendiri sehingga traversal cukup diulang
+    sebanyak kedalaman maksimum.
+    """
+    encoder = pipeline.named_steps['preprocess'].named_transformers_['cat']
+    forest = pipeline.named_steps['classifier']
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+        leaf_value = tree.value[:, 0, :]
+        value.append(leaf_value / leaf_value.sum(axis=1, keepdims=True))
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'dataset_hash': data_hash,
+        'numeric_features': NUMERIC_FEATURES,
+        'categorical_features': CATEGORICAL_FEATURES,
+        'categories': [[str(c) for c in cats] for cats in encoder.categories_],
+        'classes': [str(c) for c in forest.classes_],
+        'max_depth': int(max_depth),
+    }
+
+    # Tulis ke direktori sementara lalu rename agar proses lain tidak membaca artefak setengah jadi
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_dir, path)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Proses lain sudah lebih dulu menulis artefak yang sama
+        if not os.path.isdir(path):
+            raise
+
+
+# Fungsi untuk menghapus artefak versi/dataset lama dengan prefix yang sama
+def remove_stale_artifacts(model_dir: str, prefix: str, keep: str) -> None:
+    for stale in glob.glob(os.path.join(model_dir, f"{prefix}*")):
+        if stale == keep:
+            continue
+        if os.path.isdir(stale):
+            shutil.rmtree(stale, ignore_errors=True)
+        else:
+            # Proses lain bisa sudah menghapusnya lebih dulu
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stale)
+
+
+class ObesityModel:
+    """Random forest yang dimuat dari artefak; array numeriknya di-mmap
+    sehingga beberapa worker berbagi halaman memori yang sama."""
+
+    def __init__(self, path: str, mmap_mode: str = 'r'):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.classes_ = np.asarray(self.meta['classes'], dtype=object)
+        self.numeric_features = self.meta['numeric_features']
+        self.categorical_features = self.meta['categorical_features']
+        self.categories = self.meta['categories']
+        self.max_depth = self.meta['max_depth']
+        for name in ARRAY_NAMES:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+
+    # Encoding sama dengan ColumnTransformer: numerik apa adanya, lalu one-hot
+    def encode(self, X: pd.DataFrame) -> np.ndarray:
+        parts = [X[self.numeric_features].to_numpy(dtype=np.float64)]
+        for col, cats in zip(self.categorical_features, self.categories):
+            values = X[col].astype(str).to_numpy()
+            parts.append((values[:, None] == np.asarray(cats)[None, :]).astype(np.float64))
+        # sklearn membandingkan fitur dalam float32
+        return np.hstack(parts).astype(np.float32)
+
+    # Encoding satu baris dari dict tanpa overhead pandas
+    def encode_row(self, row: dict) -> np.ndarray:
+        values = [float(row[col]) for col in self.numeric_features]
+        for col, cats in zip(self.categorical_features, self.categories):
+            value = str(row[col])
+            values.extend(1.0 if value == cat else 0.0 for cat in cats)
+        return np.asarray([values], dtype=np.float32)
+
+    def predict_proba_encoded(self, encoded: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(encoded))[:, None]
+        node = np.broadcast_to(self.roots, (len(encoded), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = encoded[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        return self.predict_proba_encoded(self.encode(X))
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# Fungsi untuk memuat model dari disk, atau melatih ulang jika dataset berubah
+def load_or_train_model(model_dir: str = MODEL_DIR, dataset_path: str = DATASET_PATH) -> ObesityModel:
+    data_hash = dataset_hash(dataset_path)
+    path = artifact_path(data_hash, model_dir)
+    if not os.path.isdir(path):
+        export_artifact(train_model(dataset_path), path, data_hash)
+        remove_stale_artifacts(model_dir, ARTIFACT_PREFIX, path)
+    return ObesityModel(path)
+
+
+# Fungsi untuk memprediksi kategori obesitas dari isian formulir
+def predict(model: ObesityModel, input_data: dict):
+    proba = model.predict_proba_encoded(model.encode_row(form_to_feature_row(input_data)))[0]
+    best = int(np.argmax(proba))
+    label = model.classes_[best]
+    return TARGET_LABELS.get(label, label), float(proba[best])
+
+
+# Fungsi untuk memprediksi banyak isian formulir sekaligus
+def predict_batch(model: ObesityModel, forms: pd.DataFrame):
+    proba = model.predict_proba(forms_to_features(forms))
+    best = np.argmax(proba, axis=1)
+    labels = np.array([TARGET_LABELS.get(label, label) for label in model.classes_], dtype=object)
+    return labels[best], proba[np.arange(len(best)), best]
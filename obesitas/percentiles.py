@@ -0,0 +1,139 @@
+"""Indeks persentil BMI/BMR populasi referensi per (jenis kelamin, kelompok usia).
+
+Nilai referensi setiap kelompok disimpan terurut dalam satu array gabungan
+dengan offset per kelompok, sehingga satu pencarian cukup ``searchsorted``
+(O(log n)) tanpa memindai dataset.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from .config import DATASET_PATH
+from .metrics import MALE_LABEL
+
+METRICS = ('bmi', 'bmr')
+
+# Batas bawah kelompok usia (tahun); usia di bawah batas pertama menjadi kelompok sendiri
+AGE_BANDS = (18, 20, 25, 30, 40)
+
+# Kelompok yang lebih kecil dari ini memakai seluruh data jenis kelamin yang sama
+MIN_GROUP_SIZE = 30
+
+GENDERS = (MALE_LABEL, "Perempuan")
+
+
+class PercentileRank(NamedTuple):
+    bmi: float
+    bmr: float
+    # Jumlah data referensi pembanding dan label kelompoknya
+    group_size: int
+    group_label: str
+
+
+def _age_band_labels(bands) -> tuple:
+    labels = [f"< {bands[0]} tahun"]
+    labels += [f"{lo}-{hi - 1} tahun" for lo, hi in zip(bands, bands[1:])]
+    labels.append(f"≥ {bands[-1]} tahun")
+    return tuple(labels)
+
+
+class PercentileIndex:
+    """Array terurut per kelompok; dibangun sekali lalu hanya dibaca."""
+
+    def __init__(self, gender, age, values: dict, age_bands=AGE_BANDS, min_group_size: int = MIN_GROUP_SIZE):
+        self.age_bands = np.asarray(age_bands, dtype=np.float64)
+        self.band_labels = _age_band_labels(age_bands)
+        n_bands = len(self.band_labels)
+
+        groups = self.group_ids(gender, age)
+        is_male = np.asarray(gender, dtype=object) == MALE_LABEL
+        sizes = np.bincount(groups, minlength=len(GENDERS) * n_bands)
+
+        self.sorted = {}
+        self.offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        self.group_labels = []
+        for metric in METRICS:
+            column = np.asarray(values[metric], dtype=np.float64)
+            parts = []
+            for group, size in enumerate(sizes):
+                gender_index, band = divmod(group, n_bands)
+                if size >= min_group_size:
+                    part = column[groups == group]
+                    label = f"{GENDERS[gender_index]}, {self.band_labels[band]}"
+                else:
+                    part = column[is_male == (gender_index == 0)]
+                    label = f"{GENDERS[gender_index]}, semua usia"
+                parts.append(np.sort(part))
+                if metric == METRICS[0]:
+                    self.group_labels.append(label)
+            self.sorted[metric] = np.concatenate(parts)
+            self.offsets[1:] = np.cumsum([len(part) for part in parts])
+
+    # Fungsi untuk menentukan kelompok setiap baris (vektor)
+    def group_ids(self, gender, age) -> np.ndarray:
+        gender_index = (np.asarray(gender, dtype=object) != MALE_LABEL).astype(np.int64)
+        band = np.searchsorted(self.age_bands, np.asarray(age, dtype=np.float64), side='right')
+        return gender_index * len(self.band_labels) + band
+
+    def group_size(self, group: int) -> int:
+        return int(self.offsets[group + 1] - self.offsets[group])
+
+    def _group(self, gender, age) -> int:
+        return int(self.group_ids([gender], [age])[0])
+
+    def _percentile(self, metric: str, group: int, value) -> float:
+        start, end = self.offsets[group], self.offsets[group + 1]
+        below = np.searchsorted(self.sorted[metric][start:end], value, side='left')
+        return float(100.0 * below / (end - start))
+
+    # Persentase data referensi sekelompok yang nilainya lebih rendah dari `value`
+    def percentile(self, metric: str, gender, age, value) -> float:
+        return self._percentile(metric, self._group(gender, age), value)
+
+    def rank(self, gender, age, bmi, bmr) -> PercentileRank:
+        group = self._group(gender, age)
+        return PercentileRank(
+            self._percentile('bmi', group, bmi),
+            self._percentile('bmr', group, bmr),
+            self.group_size(group),
+            self.group_labels[group],
+        )
+
+    # Versi batch: satu searchsorted per kelompok untuk semua baris kelompok itu
+    def percentile_batch(self, metric: str, gender, age, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        groups = self.group_ids(gender, age)
+        result = np.empty(len(values), dtype=np.float64)
+        for group in np.unique(groups):
+            rows = groups == group
+            start, end = self.offsets[group], self.offsets[group + 1]
+            below = np.searchsorted(self.sorted[metric][start:end], values[rows], side='left')
+            result[rows] = 100.0 * below / (end - start)
+        return result
+
+    # Fungsi untuk membangun indeks dari dataset referensi
+    @classmethod
+    def from_dataset(cls, path: str = DATASET_PATH, **kwargs) -> PercentileIndex:
+        from .bulk import translate_labels
+        from .dataset import load_dataset
+        from .metrics import calculate_metrics_batch
+
+        df = translate_labels(load_dataset(path, columns=['Gender', 'Age', 'Height', 'Weight']))
+        gender = df['gender'].astype(object).to_numpy()
+        age = df['age'].to_numpy(dtype=np.float64)
+        scores = calculate_metrics_batch(
+            weight=df['weight'].to_numpy(dtype=np.float64),
+            height=df['height'].to_numpy(dtype=np.float64),
+            age=age,
+            gender=gender,
+        )
+        return cls(gender, age, {metric: scores[metric].to_numpy() for metric in METRICS}, **kwargs)
+
+
+# Indeks bersama per proses untuk dataset bawaan
+@lru_cache(maxsize=1)
+def load_percentile_index(path: str = DATASET_PATH) -> PercentileIndex:
+    return PercentileIndex.from_dataset(path)
@@ -0,0 +1,188 @@
+"""Pipeline batch multi-core untuk menilai banyak file CSV besar.
+
+Setiap file input dipecah menjadi rentang byte yang berakhir di batas baris,
+lalu setiap rentang dibaca, dinilai (``bulk.score_chunk``), dan ditulis
+sebagai satu partisi oleh proses worker. Proses utama hanya membagi tugas,
+sehingga throughput naik hampir linear dengan jumlah core.
+
+Contoh:
+    python -m obesitas.pipeline data/*.csv --out hasil --workers 8 --format csv.gz
+
+Hasil: ``<out>/<urutan>-<nama file>/part-00000.<ext>``, ... plus ``_manifest.json``.
+Urutan input membuat nama direktori unik walau nama file sama. Direktori
+output harus kosong kecuali ``--overwrite`` diberikan.
+Input diasumsikan tidak memiliki field ber-quote yang memuat baris baru.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+from .export import EXPORT_FORMATS, available_formats, write_export
+
+logger = logging.getLogger(__name__)
+
+# Ukuran target satu partisi input (byte)
+PARTITION_BYTES = 32 * 1024 * 1024
+
+# Ekstensi file -> label format di export.EXPORT_FORMATS
+FORMAT_BY_EXTENSION = {ext: label for label, (ext, _) in EXPORT_FORMATS.items()}
+
+
+class Partition(NamedTuple):
+    source: str
+    index: int
+    start: int
+    end: int
+    dest: str
+
+
+# Fungsi untuk membagi file menjadi rentang byte yang selaras dengan akhir baris
+def split_file(path: str, partition_bytes: int = PARTITION_BYTES) -> tuple:
+    """Kembalikan (header, [(start, end), ...]); rentang pertama dimulai setelah header."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        ranges = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + partition_bytes, size))
+            # Lanjutkan sampai akhir baris agar tidak ada baris yang terpotong
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+# Fungsi worker: baca satu rentang, nilai, lalu tulis partisinya
+def score_partition(partition: Partition, fmt: str) -> int:
+    import pandas as pd
+
+    from .bulk import score_chunk
+
+    with open(partition.source, 'rb') as f:
+        header = f.readline()
+        f.seek(partition.start)
+        data = f.read(partition.end - partition.start)
+    df = score_chunk(pd.read_csv(io.BytesIO(header + data)))
+
+    tmp = partition.dest + '.tmp'
+    with open(tmp, 'wb') as out:
+        write_export([df], fmt, out)
+    os.replace(tmp, partition.dest)
+    return len(df)
+
+
+# Nama direktori output satu input; urutan mencegah tabrakan nama file yang sama
+def source_dir_name(position: int, source: str) -> str:
+    return f"{position:03d}-{os.path.splitext(os.path.basename(source))[0]}"
+
+
+# Fungsi untuk menyiapkan direktori output; partisi lama tidak boleh tercampur hasil baru
+def prepare_output(out_dir: str, overwrite: bool = False, sources=()) -> None:
+    # Dicek sebelum rmtree: --overwrite tidak boleh menghapus file input
+    root = os.path.realpath(out_dir)
+    for source in sources:
+        if os.path.commonpath([root, os.path.realpath(source)]) == root:
+            raise ValueError(f"File input berada di dalam direktori output: {source}")
+    if os.path.isdir(out_dir) and os.listdir(out_dir):
+        if not overwrite:
+            raise FileExistsError(f"Direktori output tidak kosong: {out_dir} (gunakan --overwrite)")
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+
+# Fungsi untuk menyusun daftar partisi dari semua file input
+def plan_partitions(sources, out_dir: str, ext: str, partition_bytes: int = PARTITION_BYTES) -> list:
+    partitions = []
+    for position, source in enumerate(sources):
+        target = os.path.join(out_dir, source_dir_name(position, source))
+        os.makedirs(target, exist_ok=True)
+        _, ranges = split_file(source, partition_bytes)
+        for index, (start, end) in enumerate(ranges):
+            dest = os.path.join(target, f"part-{index:05d}.{ext}")
+            partitions.append(Partition(source, index, start, end, dest))
+    return partitions
+
+
+# Fungsi untuk menjalankan pipeline pada semua file input
+def run_pipeline(sources, out_dir: str, workers: int = None, ext: str = 'csv',
+                 partition_bytes: int = PARTITION_BYTES, progress=None, overwrite: bool = False) -> dict:
+    """Nilai semua `sources` secara paralel dan kembalikan ringkasan per file.
+
+    `progress(done, total, rows)` dipanggil setiap satu partisi selesai.
+    `out_dir` yang tidak kosong ditolak, atau dikosongkan dulu jika `overwrite`;
+    input yang berada di dalam `out_dir` selalu ditolak.
+    """
+    fmt = FORMAT_BY_EXTENSION.get(ext)
+    if fmt is None or fmt not in available_formats():
+        raise ValueError(f"Format output tidak didukung: {ext}")
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    prepare_output(out_dir, overwrite, sources)
+    partitions = plan_partitions(sources, out_dir, ext, partition_bytes)
+    # Disusun dari input, bukan partisi, agar file tanpa baris data tetap punya manifest
+    summary = {source_dir_name(position, source): {'source': source, 'partitions': {}}
+               for position, source in enumerate(sources)}
+
+    rows = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(score_partition, p, fmt): p for p in partitions}
+        for done, future in enumerate(as_completed(futures), start=1):
+            partition = futures[future]
+            count = future.result()
+            rows += count
+            name = os.path.basename(os.path.dirname(partition.dest))
+            summary[name]['partitions'][os.path.basename(partition.dest)] = count
+            if progress is not None:
+                progress(done, len(partitions), rows)
+
+    elapsed = time.perf_counter() - started
+    for name, entry in summary.items():
+        entry['partitions'] = dict(sorted(entry['partitions'].items()))
+        entry['rows'] = sum(entry['partitions'].values())
+        with open(os.path.join(out_dir, name, '_manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+
+    return {
+        'files': len(summary),
+        'partitions': len(partitions),
+        'rows': rows,
+        'workers': workers,
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_s': round(rows / elapsed, 1) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline penilaian CSV obesitas multi-core")
+    parser.add_argument('sources', nargs='+', help="File CSV berformat sama dengan dataset")
+    parser.add_argument('--out', required=True, help="Direktori output partisi")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: jumlah core)")
+    parser.add_argument('--format', default='csv', choices=sorted(FORMAT_BY_EXTENSION), dest='ext')
+    parser.add_argument('--partition-mb', type=float, default=PARTITION_BYTES / (1024 * 1024))
+    parser.add_argument('--overwrite', action='store_true', help="Hapus isi direktori output yang sudah ada")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    def progress(done, total, rows):
+        logger.info("%d/%d partisi selesai, %d baris", done, total, rows)
+
+    try:
+        report = run_pipeline(args.sources, args.out, args.workers, args.ext,
+                              int(args.partition_mb * 1024 * 1024), progress, args.overwrite)
+    except (FileExistsError, ValueError) as err:
+        parser.error(str(err))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import operator
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
+
+# numpy/pandas hanya dibutuhkan jalur batch dan diimpor di dalam fungsinya
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+DIET_KEY = "🥗 Rekomendasi Cara Diet"
+EXERCISE_KEY = "💪 Rekomendasi Olahraga"
+LIFESTYLE_KEY = "🧘‍♀️ Rekomendasi Gaya Hidup"
+TARGET_KEY = "Target"
+
+# Tabel aturan rekomendasi. Setiap aturan: (field, operator, nilai, default jika field kosong, teks)
+RULE_TABLE = {
+    'diet_factors': [
+        ('FAVC', 'eq', 'ya', '', "Anda sering mengonsumsi makanan tinggi kalori"),
+        ('FCVC', 'lt', 2, 0, "Konsumsi sayur dan buah kurang"),
+        ('NCP', 'in', ('1', '2'), '', "Jumlah makan utama per hari kurang"),
+        ('CAEC', 'in', ('Sering', 'Selalu'), '', "Sering mengonsumsi camilan"),
+    ],
+    # Target dan diet per kategori BMI; kategori lain memakai 'default'
+    'categories': {
+        "Insufficient Weight": {
+            'target': "Meningkatkan berat badan 0.5-1 kg per minggu hingga mencapai BMI minimal 18.5",
+            'diet': [
+                "Tingkatkan asupan kalori 500-1000 kkal di atas kebutuhan maintenance",
+                "Konsumsi protein tinggi (1.6-2.2 gram/kg berat badan)",
+                "Makan 5-6 kali sehari dengan porsi sedang",
+                "Fokus pada makanan padat nutrisi dan kalori"
+            ],
+            'factor_prefix': "Perhatian",
+        },
+        "Normal Weight": {
+            'target': "Mempertahankan berat badan current dengan fluktuasi maksimal 2 kg",
+            'diet': [
+                "Pertahankan asupan kalori sesuai kebutuhan maintenance",
+                "Konsumsi protein 1.2-1.6 gram/kg berat badan",
+                "Jaga pola makan 3 kali sehari dengan 2 snack",
+                "Seimbangkan makronutrien (50% karbo, 30% protein, 20% lemak)"
+            ],
+            'factor_prefix': "Perhatian",
+        },
+        'default': {
+            'target': "Menurunkan berat badan 0.5-1 kg per minggu hingga mencapai BMI 24.9",
+            'diet': [
+                "Kurangi asupan kalori 500-750 kkal di bawah maintenance",
+                "Tingkatkan protein (1.8-2.2 gram/kg ideal body weight)",
+                "Batasi karbohidrat sederhana dan lemak jenuh",
+                "Makan 3 kali sehari dengan porsi terkontrol",
+                "Utamakan sayuran dan protein lean"
+            ],
+            'factor_prefix': "Fokus perbaiki",
+        },
+    },
+    # Rekomendasi olahraga berdasarkan Physical Activity Frequency (FAF); nilai lain memakai '1'
+    'exercise': {
+        "1": [
+            "Mulai dengan 30 menit jalan kaki setiap hari",
+            "Tambahkan latihan kekuatan 2x seminggu",
+            "Target: 150 menit aktivitas sedang per minggu",
+            "Fokus pada latihan dasar seperti squat, push-up, dan plank"
+        ],
+        "2": [
+            "Pertahankan rutinitas olahraga 3-4x seminggu",
+            "Kombinasikan cardio dan strength training",
+            "Target: 200 menit aktivitas sedang per minggu",
+            "Tambahkan variasi latihan untuk menghindari plateau"
+        ],
+        "3": [
+            "Lanjutkan rutinitas olahraga intensif",
+            "Fokus pada high-intensity interval training (HIIT)",
+            "Target: 250-300 menit aktivitas sedang per minggu",
+            "Pertimbangkan untuk bekerja dengan personal trainer"
+        ],
+    },
+    'exercise_default': "1",
+    'exercise_factors': [
+        ('TUE', 'gt', 8, 0, "Waktu screen time tinggi"),
+    ],
+    'lifestyle': [
+        ('CH2O', 'lt', 2.0, 0, ["Tingkatkan konsumsi air minimal 2L/hari"]),
+        ('SMOKE', 'eq', 'ya', '', ["Pertimbangkan program berhenti merokok"]),
+        ('TUE', 'gt', 8, 0, [
+            "Kurangi screen time, gunakan teknik 20-20-20 untuk kesehatan mata",
+            "Atur postur saat menggunakan gadget"
+        ]),
+    ],
+    # Jika tidak ada rekomendasi gaya hidup spesifik
+    'lifestyle_default': [
+        "Pertahankan gaya hidup sehat",
+        "Jaga kualitas tidur 7-9 jam per hari",
+        "Kelola stress dengan meditasi atau yoga",
+        "Lakukan check-up kesehatan rutin"
+    ],
+}
+
+_SCALAR_OPS = {
+    'eq': operator.eq,
+    'lt': operator.lt,
+    'gt': operator.gt,
+    'in': lambda value, options: value in options,
+}
+
+_VECTOR_OPS = {
+    'eq': lambda col, value: col == value,
+    'lt': lambda col, value: col < value,
+    'gt': lambda col, value: col > value,
+    'in': lambda col, options: col.isin(options),
+}
+
+
+class Rule(NamedTuple):
+    field: str
+    op: str
+    value: object
+    default: object
+    text: object
+
+    def test(self, input_data: dict) -> bool:
+        return _SCALAR_OPS[self.op](input_data.get(self.field, self.default), self.value)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        import numpy as np
+
+        if self.field not in df.columns:
+            return np.full(len(df), bool(_SCALAR_OPS[self.op](self.default, self.value)))
+        return np.asarray(_VECTOR_OPS[self.op](df[self.field], self.value), dtype=bool)
+
+
+class CategoryPlan(NamedTuple):
+    target: str
+    diet: tuple
+    factor_prefix: str
+
+
+class RuleEngine(NamedTuple):
+    diet_factors: tuple
+    category_names: tuple
+    category_plans: tuple
+    exercise_keys: MappingProxyType
+    exercise_plans: tuple
+    exercise_default: int
+    exercise_factors: tuple
+    lifestyle: tuple
+    lifestyle_default: tuple
+
+
+# Kompilasi tabel aturan menjadi struktur immutable; dijalankan sekali saat modul dimuat
+def compile_rules(table: dict) -> RuleEngine:
+    def rules(entries, as_tuple=False):
+        return tuple(Rule(f, op, v, d, tuple(t) if as_tuple else t) for f, op, v, d, t in entries)
+
+    categories = {name: plan for name, plan in table['categories'].items() if name != 'default'}
+    plans = list(categories.values()) + [table['categories']['default']]
+    exercise_keys = list(table['exercise'])
+    return RuleEngine(
+        diet_factors=rules(table['diet_factors']),
+        category_names=tuple(categories),
+        category_plans=tuple(CategoryPlan(p['target'], tuple(p['diet']), p['factor_prefix']) for p in plans),
+        exercise_keys=MappingProxyType({key: i for i, key in enumerate(exercise_keys)}),
+        exercise_plans=tuple(tuple(table['exercise'][key]) for key in exercise_keys),
+        exercise_default=exercise_keys.index(table['exercise_default']),
+        exercise_factors=rules(table['exercise_factors']),
+        lifestyle=rules(table['lifestyle'], as_tuple=True),
+        lifestyle_default=tuple(table['lifestyle_default']),
+    )
+
+
+ENGINE = compile_rules(RULE_TABLE)
+
+
+def _bits(hits) -> int:
+    return sum(1 << i for i, hit in enumerate(hits) if hit)
+
+
+# Susun rekomendasi dari kode hasil evaluasi aturan; hasilnya di-cache per kombinasi kode
+@lru_cache(maxsize=None)
+def _compose(category: int, diet_bits: int, exercise: int, exercise_bits: int, lifestyle_bits: int) -> tuple:
+    engine = ENGINE
+    plan = engine.category_plans[category]
+
+    diet = plan.diet
+    factors = [r.text for i, r in enumerate(engine.diet_factors) if diet_bits >> i & 1]
+    if factors:
+        diet = diet + (f"{plan.factor_prefix}: {', '.join(factors)}",)
+
+    exercise_recs = engine.exercise_plans[exercise]
+    extra = [r.text for i, r in enumerate(engine.exercise_factors) if exercise_bits >> i & 1]
+    if extra:
+        exercise_recs = exercise_recs + (f"Perhatian: {', '.join(extra)}",)
+
+    lifestyle = tuple(text for i, r in enumerate(engine.lifestyle) if lifestyle_bits >> i & 1 for text in r.text)
+    if not lifestyle:
+        lifestyle = engine.lifestyle_default
+
+    return plan.target, diet, exercise_recs, lifestyle
+
+
+def _category_index(bmi_category) -> int:
+    names = ENGINE.category_names
+    return names.index(bmi_category) if bmi_category in names else len(names)
+
+
+# Fungsi untuk generate rekomendasi
+def generate_recommendations(bmi_category: str, input_data: dict) -> dict:
+    engine = ENGINE
+    target, diet, exercise, lifestyle = _compose(
+        _category_index(bmi_category),
+        _bits(r.test(input_data) for r in engine.diet_factors),
+        engine.exercise_keys.get(input_data.get('FAF', '1'), engine.exercise_default),
+        _bits(r.test(input_data) for r in engine.exercise_factors),
+        _bits(r.test(input_data) for r in engine.lifestyle),
+    )
+    return {
+        DIET_KEY: list(diet),
+        EXERCISE_KEY: list(exercise),
+        LIFESTYLE_KEY: list(lifestyle),
+        TARGET_KEY: target,
+    }
+
+
+def _mask_bits(rules, df: pd.DataFrame) -> np.ndarray:
+    import numpy as np
+
+    bits = np.zeros(len(df), dtype=np.int64)
+    for i, rule in enumerate(rules):
+        bits |= rule.mask(df).astype(np.int64) << i
+    return bits
+
+
+# Fungsi untuk generate rekomendasi untuk banyak baris sekaligus
+def generate_recommendations_batch(categories, df: pd.DataFrame, sep: str = None) -> pd.DataFrame:
+    """Evaluasi semua aturan secara vektor untuk setiap baris `df`.
+
+    Rekomendasi hanya disusun sekali per kombinasi hasil aturan yang unik,
+    lalu disebar kembali ke setiap baris. Isi kolom berupa tuple teks, atau
+    string yang digabung dengan `sep` jika diberikan.
+    """
+    import numpy as np
+    import pandas as pd
+
+    engine = ENGINE
+    categories = np.asarray(categories, dtype=object)
+    category = np.full(len(df), len(engine.category_names), dtype=np.int64)
+    for i, name in enumerate(engine.category_names):
+        category[categories == name] = i
+
+    if 'FAF' in df.columns:
+        exercise = df['FAF'].map(dict(engine.exercise_keys)).fillna(engine.exercise_default).to_numpy(dtype=np.int64)
+    else:
+        exercise = np.full(len(df), engine.exercise_default, dtype=np.int64)
+
+    codes = np.stack([
+        category,
+        _mask_bits(engine.diet_factors, df),
+        exercise,
+        _mask_bits(engine.exercise_factors, df),
+        _mask_bits(engine.lifestyle, df),
+    ], axis=1)
+    unique_codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    composed = [_compose(*map(int, code)) for code in unique_codes]
+    columns = {}
+    for key, position in ((TARGET_KEY, 0), (DIET_KEY, 1), (EXERCISE_KEY, 2), (LIFESTYLE_KEY, 3)):
+        values = np.empty(len(composed), dtype=object)
+        for i, parts in enumerate(composed):
+            part = parts[position]
+            values[i] = sep.join(part) if sep is not None and key != TARGET_KEY else part
+        columns[key] = values[inverse]
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,184 @@
+"""Simulasi "bagaimana jika" untuk satu profil.
+
+Profil yang sudah dianalisis diulang untuk setiap kombinasi perubahan berat
+badan, frekuensi olahraga (FAF), konsumsi air (CH2O), dan screen time (TUE).
+Seluruh grid dihitung dalam satu panggilan batch: metrik, rekomendasi, dan
+prediksi model memakai jalur vektor yang sama dengan unggahan CSV.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from .analysis import PROFILE_FIELDS, profile_fingerprint
+from .cache import TTLCache
+from .config import ANALYSIS_CACHE_TTL
+from .metrics import calculate_metrics_batch
+from .recommendations import DIET_KEY, EXERCISE_KEY, LIFESTYLE_KEY, TARGET_KEY, generate_recommendations_batch
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Urutan tingkat prediksi model, dari paling ringan ke paling berat
+PREDICTION_LEVELS = (
+    "Insufficient Weight",
+    "Normal Weight",
+    "Overweight Level I",
+    "Overweight Level II",
+    "Obesity Type I",
+    "Obesity Type II",
+    "Obesity Type III",
+)
+
+# Batas berat badan di formulir (kg)
+WEIGHT_RANGE = (5.0, 300.0)
+
+# Nilai yang bisa ditampilkan di heatmap: label UI -> kolom hasil
+HEATMAP_VALUES = {
+    'Prediksi Model': 'prediction_level',
+    'BMI': 'bmi',
+    'BMR': 'bmr',
+}
+
+
+class ScenarioGrid(NamedTuple):
+    """Nilai yang dicoba untuk setiap sumbu; tuple agar bisa menjadi kunci cache."""
+    weight_deltas: tuple = tuple(range(-10, 6))
+    faf: tuple = ("1", "2", "3")
+    water: tuple = (1.0, 1.5, 2.0, 2.5, 3.0)
+    screen: tuple = (1.0, 3.0, 5.0, 8.0, 10.0)
+
+    def __len__(self) -> int:
+        return len(self.weight_deltas) * len(self.faf) * len(self.water) * len(self.screen)
+
+    def within_weight_range(self, weight: float) -> 'ScenarioGrid':
+        """Buang perubahan berat yang keluar dari batas formulir.
+
+        Berat tidak di-clamp, karena clamp membuat beberapa kolom heatmap
+        berisi berat yang sama.
+        """
+        low, high = WEIGHT_RANGE
+        deltas = tuple(delta for delta in self.weight_deltas if low <= weight + delta <= high)
+        return ScenarioGrid(deltas, self.faf, self.water, self.screen)
+
+
+# Hasil simulasi dibagi antar sesi per (sidik jari profil, grid)
+SCENARIO_CACHE = TTLCache(maxsize=64, ttl=ANALYSIS_CACHE_TTL)
+
+
+# Fungsi untuk membuat satu baris formulir per skenario dari profil dasar
+def scenario_forms(profile: dict, grid: ScenarioGrid) -> pd.DataFrame:
+    import pandas as pd
+
+    # Sumbu berat paling dalam sehingga setiap kombinasi gaya hidup membentuk satu baris heatmap
+    faf, water, screen, delta = (
+        axis.ravel() for axis in np.meshgrid(
+            np.asarray(grid.faf, dtype=object),
+            np.asarray(grid.water, dtype=np.float64),
+            np.asarray(grid.screen, dtype=np.float64),
+            np.asarray(grid.weight_deltas, dtype=np.float64),
+            indexing='ij',
+        )
+    )
+    size = len(delta)
+    forms = pd.DataFrame({field: np.full(size, profile[field], dtype=object) for field in PROFILE_FIELDS})
+    for field in ('age', 'height', 'FCVC'):
+        forms[field] = np.full(size, profile[field], dtype=np.float64)
+    forms['weight'] = float(profile['weight']) + delta
+    forms['weight_delta'] = delta
+    forms['FAF'] = faf
+    forms['CH2O'] = water
+    forms['TUE'] = screen
+    return forms
+
+
+# Prediksi seperti predict_batch, tetapi setiap baris fitur unik hanya ditelusuri sekali;
+# konsumsi air dan screen time dibulatkan ke skala dataset sehingga banyak skenario berfitur sama
+def _predict_unique(model, forms: pd.DataFrame):
+    from .model import TARGET_LABELS, forms_to_features
+
+    encoded = model.encode(forms_to_features(forms))
+    unique_rows, inverse = np.unique(encoded, axis=0, return_inverse=True)
+    proba = model.predict_proba_encoded(unique_rows)[inverse.reshape(-1)]
+    best = np.argmax(proba, axis=1)
+    labels = np.array([TARGET_LABELS.get(label, label) for label in model.classes_], dtype=object)
+    return labels[best], proba[np.arange(len(best)), best]
+
+
+# Fungsi untuk menghitung seluruh grid skenario sekaligus
+def run_scenarios(profile: dict, grid: ScenarioGrid = ScenarioGrid(), model=None) -> pd.DataFrame:
+    """Satu baris per skenario: isian yang diubah, metrik, rekomendasi, dan prediksi.
+
+    Perubahan berat di luar batas formulir dilewati (lihat `within_weight_range`).
+    """
+    forms = scenario_forms(profile, grid.within_weight_range(float(profile['weight'])))
+    metrics = calculate_metrics_batch(forms)
+    recommendations = generate_recommendations_batch(metrics['category'], forms)
+    result = forms[['weight_delta', 'weight', 'FAF', 'CH2O', 'TUE']].join(metrics).join(recommendations)
+    if model is not None:
+        labels, proba = _predict_unique(model, forms)
+        result['prediction'] = labels
+        result['prediction_proba'] = proba
+        level = {label: i for i, label in enumerate(PREDICTION_LEVELS)}
+        result['prediction_level'] = np.array([level.get(label, -1) for label in labels], dtype=np.int8)
+    return result
+
+
+# Fungsi untuk simulasi dengan cache per profil dan grid
+def simulate(profile: dict, grid: ScenarioGrid = ScenarioGrid(), model=None,
+             cache: TTLCache = SCENARIO_CACHE) -> pd.DataFrame:
+    """Hasilnya dibagi antar pemanggil; perlakukan sebagai read-only."""
+    key = (profile_fingerprint(profile), grid, model is not None)
+    return cache.get_or_compute(key, lambda: run_scenarios(profile, grid, model))
+
+
+# Fungsi untuk mengambil rekomendasi satu skenario dalam format generate_recommendations
+def scenario_recommendations(row) -> dict:
+    return {
+        DIET_KEY: list(row[DIET_KEY]),
+        EXERCISE_KEY: list(row[EXERCISE_KEY]),
+        LIFESTYLE_KEY: list(row[LIFESTYLE_KEY]),
+        TARGET_KEY: row[TARGET_KEY],
+    }
+
+
+# Fungsi untuk membuat heatmap: sumbu x berat badan, sumbu y kombinasi FAF/air/screen time
+def scenario_heatmap(scenarios: pd.DataFrame, grid: ScenarioGrid, value: str = 'bmi'):
+    import plotly.graph_objects as go
+
+    # Kolom diambil dari hasil, karena perubahan berat di luar batas sudah dilewati
+    columns = scenarios['weight_delta'].nunique()
+    rows = len(scenarios) // columns
+    weights = scenarios['weight'].to_numpy()[:columns]
+    labels = [f"FAF {faf} · {water:g} L · {screen:g} jam"
+              for faf, water, screen in itertools.product(grid.faf, grid.water, grid.screen)]
+
+    z = scenarios[value].to_numpy(dtype=np.float64).reshape(rows, columns)
+    predictions = scenarios['prediction'] if 'prediction' in scenarios else scenarios['category']
+    customdata = np.stack([
+        scenarios['bmi'].round(2).to_numpy(dtype=object),
+        scenarios['bmr'].round(0).to_numpy(dtype=object),
+        scenarios['category'].to_numpy(dtype=object),
+        predictions.to_numpy(dtype=object),
+        scenarios[LIFESTYLE_KEY].map(len).to_numpy(dtype=object),
+    ], axis=1).reshape(rows, columns, 5)
+
+    heatmap = go.Heatmap(
+        x=weights, y=labels, z=z, customdata=customdata,
+        colorscale='RdYlGn_r',
+        hovertemplate="Berat %{x:.1f} kg · %{y}<br>BMI %{customdata[0]} (%{customdata[2]})"
+                      "<br>BMR %{customdata[1]} kkal/hari<br>Prediksi %{customdata[3]}"
+                      "<br>%{customdata[4]} rekomendasi gaya hidup<extra></extra>",
+    )
+    if value == 'prediction_level':
+        heatmap.update(zmin=0, zmax=len(PREDICTION_LEVELS) - 1, colorbar={
+            'tickvals': list(range(len(PREDICTION_LEVELS))), 'ticktext': list(PREDICTION_LEVELS),
+        })
+    fig = go.Figure(heatmap)
+    fig.update_layout(
+        xaxis_title='Berat Badan (kg)', yaxis_title='Olahraga · Air · Screen time',
+        height=max(400, 14 * rows + 120), yaxis={'autorange': 'reversed'},
+    )
+    return fig
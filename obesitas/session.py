@@ -0,0 +1,114 @@
+"""Batas dan laporan memori per sesi.
+
+Aset read-only (model, indeks, CSS, teks, figure statis) dibagi per proses;
+yang tersisa per sesi adalah hasil terakhir dan, bila dipakai, buffer
+riwayat sesi. Modul ini memperkirakan ukurannya, membuang riwayat lama saat
+batas terlampaui (baris yang dibuang sudah tersimpan di ``HistoryStore``),
+dan mencatat pemakaian setiap sesi agar bisa dilaporkan.
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .config import SESSION_MEMORY_LIMIT
+from .history import HistoryBuffer
+
+# Jumlah baris terbaru yang selalu dipertahankan agar grafik sesi tetap berisi
+MIN_HISTORY_ROWS = 10
+
+# Sesi yang tidak rerun selama ini dianggap sudah ditutup
+SESSION_IDLE_SECONDS = 3600
+
+
+# Fungsi untuk memperkirakan memori sebuah objek beserta isinya
+def estimate_size(obj, seen: set = None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, HistoryBuffer):
+        return obj.nbytes() + sum(estimate_size(value, seen) for value in obj.derived_values())
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, 'to_plotly_json'):
+        return estimate_size(obj.to_plotly_json(), seen)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_size(vars(obj), seen)
+    return size
+
+
+# Fungsi untuk menghitung pemakaian memori per kunci session state
+def session_usage(state) -> dict:
+    seen = set()
+    return {str(key): estimate_size(state[key], seen) for key in list(state.keys())}
+
+
+# Fungsi untuk menjaga memori sesi di bawah batas dengan membuang riwayat terlama
+def enforce_memory_limit(buffer: HistoryBuffer, other_bytes: int = 0, limit: int = SESSION_MEMORY_LIMIT) -> int:
+    """Mengembalikan jumlah baris yang dibuang dari buffer."""
+    budget = limit - other_bytes
+    if estimate_size(buffer) <= budget:
+        return 0
+    # Turunan (DataFrame, grafik) dibangun ulang bila perlu; buang lebih dulu
+    buffer.clear_derived()
+    used = buffer.nbytes()
+    if used <= budget or len(buffer) <= MIN_HISTORY_ROWS:
+        return 0
+
+    per_row = used / len(buffer)
+    # Sisakan ruang separuh anggaran agar eviction tidak terjadi di setiap append
+    keep = max(MIN_HISTORY_ROWS, int(budget / 2 / per_row))
+    dropped = len(buffer) - keep
+    buffer.drop_oldest(dropped)
+    return max(dropped, 0)
+
+
+class SessionMemoryTracker:
+    """Pemakaian memori terakhir setiap sesi dalam proses ini."""
+
+    def __init__(self, idle_seconds: float = SESSION_IDLE_SECONDS, timer=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.timer = timer
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def update(self, session_id: str, usage: dict) -> None:
+        with self._lock:
+            self._sessions[session_id] = (self.timer(), sum(usage.values()), usage)
+
+    def _prune(self) -> None:
+        cutoff = self.timer() - self.idle_seconds
+        for session_id in [sid for sid, (seen, _, _) in self._sessions.items() if seen < cutoff]:
+            del self._sessions[session_id]
+
+    def snapshot(self) -> list:
+        """Sesi aktif, pemakai memori terbesar lebih dulu."""
+        with self._lock:
+            self._prune()
+            rows = [
+                {'session': session_id[:8], 'bytes': total, 'idle_s': round(self.timer() - seen, 1)}
+                for session_id, (seen, total, _) in self._sessions.items()
+            ]
+        return sorted(rows, key=lambda row: row['bytes'], reverse=True)
+
+    def totals(self) -> dict:
+        rows = self.snapshot()
+        return {
+            'sessions': len(rows),
+            'session_memory_bytes': sum(row['bytes'] for row in rows),
+            'session_memory_max_bytes': max((row['bytes'] for row in rows), default=0),
+        }
+
+
+SESSION_MEMORY = SessionMemoryTracker()
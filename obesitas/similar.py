@@ -0,0 +1,186 @@
+"""Pencarian profil serupa di dataset referensi dengan indeks KD-tree.
+
+Fitur formulir dienkode dan distandardisasi sekali, lalu KD-tree (scipy
+``cKDTree``) dibangun dan disimpan di ``MODEL_DIR`` dengan kunci hash dataset,
+seperti artefak model. Kueri satu profil maupun batch tidak memindai dataset.
+"""
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from .config import DATASET_PATH, MODEL_DIR
+from .metrics import MALE_LABEL
+from .model import (
+    NUMERIC_FEATURES, TARGET, TARGET_LABELS, dataset_hash, form_to_feature_row, forms_to_features,
+    remove_stale_artifacts,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Naikkan jika encoding fitur atau format indeks berubah
+INDEX_VERSION = 1
+INDEX_PREFIX = "similar_profiles"
+
+DEFAULT_K = 5
+
+# Field ya/tidak dienkode 0/1 terhadap nilai positifnya
+BINARY_FEATURES = {
+    'gender': MALE_LABEL,
+    'family_history': 'ya',
+    'FAVC': 'ya',
+    'SMOKE': 'ya',
+    'SCC': 'ya',
+}
+# Field frekuensi dienkode sebagai urutan 0-3
+FREQUENCY_ORDER = ("Tidak Pernah", "Kadang", "Sering", "Selalu")
+ORDINAL_FEATURES = ('CAEC', 'CALC')
+ONE_HOT_FEATURES = ('MTRANS',)
+
+# Kolom dataset yang ikut ditampilkan untuk setiap tetangga
+REFERENCE_COLUMNS = ('age', 'height', 'weight')
+
+
+class Neighbor(NamedTuple):
+    distance: float
+    label: str
+    gender: str
+    age: float
+    height: float
+    weight: float
+
+
+# Fungsi untuk mengenkode fitur (skala dataset) menjadi matriks numerik sebelum standardisasi
+def encode_features(X, categories: dict) -> np.ndarray:
+    """`X` berupa DataFrame atau dict kolom -> array; `categories` berisi kategori one-hot."""
+    parts = [np.asarray(X[col], dtype=np.float64)[:, None] for col in NUMERIC_FEATURES]
+    for col, positive in BINARY_FEATURES.items():
+        parts.append((np.asarray(X[col], dtype=object) == positive).astype(np.float64)[:, None])
+    order = {label: i for i, label in enumerate(FREQUENCY_ORDER)}
+    for col in ORDINAL_FEATURES:
+        parts.append(np.array([order.get(value, 0) for value in np.asarray(X[col], dtype=object)], dtype=np.float64)[:, None])
+    for col in ONE_HOT_FEATURES:
+        values = np.asarray(X[col], dtype=object)
+        parts.append((values[:, None] == np.asarray(categories[col], dtype=object)[None, :]).astype(np.float64))
+    return np.hstack(parts)
+
+
+class SimilarityIndex:
+    """KD-tree atas fitur terstandardisasi; array referensi dimuat dengan mmap."""
+
+    def __init__(self, path: str, mmap_mode: str = 'r'):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.categories = self.meta['categories']
+        self.labels = np.asarray(self.meta['labels'], dtype=object)
+        self.mean = np.asarray(self.meta['mean'], dtype=np.float64)
+        self.scale = np.asarray(self.meta['scale'], dtype=np.float64)
+        # Pickle hanya dibaca dari artefak yang ditulis build_index sendiri
+        with open(os.path.join(path, "tree.pkl"), 'rb') as f:
+            self.tree = pickle.load(f)
+        self.label_codes = np.load(os.path.join(path, "label.npy"), mmap_mode=mmap_mode)
+        self.male = np.load(os.path.join(path, "male.npy"), mmap_mode=mmap_mode)
+        for col in REFERENCE_COLUMNS:
+            setattr(self, col, np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mmap_mode))
+
+    def __len__(self) -> int:
+        return self.tree.n
+
+    def standardize(self, encoded: np.ndarray) -> np.ndarray:
+        return (encoded - self.mean) / self.scale
+
+    # Fungsi untuk mencari k profil terdekat dari satu isian formulir
+    def query(self, input_data: dict, k: int = DEFAULT_K) -> list:
+        row = {col: [value] for col, value in form_to_feature_row(input_data).items()}
+        distances, indices = self.tree.query(self.standardize(encode_features(row, self.categories))[0], k=k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        return [
+            Neighbor(
+                float(distance),
+                self.labels[self.label_codes[i]],
+                MALE_LABEL if self.male[i] else "Perempuan",
+                float(self.age[i]),
+                float(self.height[i]),
+                float(self.weight[i]),
+            )
+            for distance, i in zip(distances, indices)
+        ]
+
+    # Fungsi untuk mencari tetangga banyak isian formulir sekaligus
+    def query_batch(self, forms: pd.DataFrame, k: int = DEFAULT_K, workers: int = 1):
+        """Mengembalikan (jarak, indeks baris referensi, label) berbentuk (n, k)."""
+        encoded = self.standardize(encode_features(forms_to_features(forms), self.categories))
+        distances, indices = self.tree.query(encoded, k=k, workers=workers)
+        distances, indices = distances.reshape(len(forms), k), indices.reshape(len(forms), k)
+        return distances, indices, self.labels[self.label_codes[indices]]
+
+
+# Fungsi untuk membangun indeks dari dataset dan menyimpannya ke disk
+def build_index(path: str, dataset_path: str = DATASET_PATH, data_hash: str = None) -> None:
+    from scipy.spatial import cKDTree
+
+    from .model import load_training_data
+
+    X, y = load_training_data(dataset_path)
+    categories = {col: sorted(str(value) for value in X[col].astype(object).unique()) for col in ONE_HOT_FEATURES}
+    encoded = encode_features(X, categories)
+    mean = encoded.mean(axis=0)
+    scale = encoded.std(axis=0)
+    # Kolom konstan tidak ikut menentukan jarak
+    scale[scale == 0] = 1.0
+    points = (encoded - mean) / scale
+
+    target = y.astype(object).to_numpy()
+    labels = sorted(set(target))
+    codes = {label: i for i, label in enumerate(labels)}
+    arrays = {
+        'label': np.array([codes[label] for label in target], dtype=np.int16),
+        'male': (X['gender'].astype(object).to_numpy() == MALE_LABEL),
+    }
+    for col in REFERENCE_COLUMNS:
+        arrays[col] = X[col].to_numpy(dtype=np.float32)
+    meta = {
+        'version': INDEX_VERSION,
+        'dataset_hash': data_hash,
+        'target': TARGET,
+        'categories': categories,
+        'labels': [TARGET_LABELS.get(label, label) for label in labels],
+        'mean': mean.tolist(),
+        'scale': scale.tolist(),
+    }
+
+    # Tulis ke direktori sementara lalu rename, sama seperti artefak model
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(tmp_dir, "tree.pkl"), 'wb') as f:
+            pickle.dump(cKDTree(points), f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_dir, path)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Proses lain sudah lebih dulu menulis indeks yang sama
+        if not os.path.isdir(path):
+            raise
+
+
+# Fungsi untuk memuat indeks dari disk, atau membangunnya jika dataset berubah
+def load_or_build_index(model_dir: str = MODEL_DIR, dataset_path: str = DATASET_PATH) -> SimilarityIndex:
+    data_hash = dataset_hash(dataset_path)
+    path = os.path.join(model_dir, f"{INDEX_PREFIX}-v{INDEX_VERSION}-{data_hash[:16]}")
+    if not os.path.isdir(path):
+        build_index(path, dataset_path, data_hash)
+        remove_stale_artifacts(model_dir, INDEX_PREFIX, path)
+    return SimilarityIndex(path)
@@ -0,0 +1,157 @@
+"""Teks statis antarmuka: CSS kustom dan penjelasan BMI/BMR."""
+
+# CSS kustom untuk tampilan yang lebih baik
+APP_CSS = """
+    <style>
+    /* Base styles */
+    body {
+        background-color: #1e1e1e;
+        color: white;
+    }
+    
+    /* Container styles */
+    .main {
+        padding: 1rem 2rem;
+    }
+    
+    /* Card styles */
+    .card {
+        background-color: #2c2c2c;
+        border-radius: 15px;
+        padding: 1.5rem;
+        margin-bottom: 1.5rem;
+        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+        border-left: 5px solid #0066cc;
+        transition: all 0.3s ease;
+    }
+    
+    .card:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 6px 12px rgba(0,0,0,0.3);
+    }
+    
+    /* Section headers */
+    .section-header {
+        font-size: 1.4rem;
+        font-weight: bold;
+        color: #0066cc;
+        margin-bottom: 1.2rem;
+        padding-bottom: 0.5rem;
+        border-bottom: 2px solid #0066cc;
+    }
+    
+    /* Input field styling */
+    .stTextInput > div > div > input {
+        background-color: #3a3a3a;
+        color: white;
+        border: 1px solid #4a4a4a;
+        border-radius: 8px;
+        padding: 0.5rem;
+    }
+    
+    /* Button styling */
+    .stButton > button {
+        width: 100%;
+        padding: 0.8rem !important;
+        font-size: 1.2rem !important;
+        font-weight: bold !important;
+        background-color: #0066cc !important;
+        color: white !important;
+        border: none !important;
+        border-radius: 10px !important;
+        transition: all 0.3s ease;
+    }
+    
+    .stButton > button:hover {
+        background-color: #0052a3 !important;
+        transform: translateY(-2px);
+    }
+    
+    /* Metric value styling */
+    .metric-value {
+        font-size: 2.5rem;
+        font-weight: bold;
+        text-align: center;
+        padding: 1rem;
+        background-color: #3a3a3a;
+        border-radius: 10px;
+        margin: 1rem 0;
+    }
+    
+    /* History table styling */
+    .history-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 1rem 0;
+    }
+    
+    .history-table th, .history-table td {
+        padding: 0.8rem;
+        text-align: left;
+        border-bottom: 1px solid #4a4a4a;
+    }
+    
+    .history-table th {
+        background-color: #0066cc;
+        color: white;
+    }
+    
+    /* Toast notification styling */
+    .toast {
+        position: fixed;
+        bottom: 20px;
+        right: 20px;
+        padding: 1rem;
+        background-color: #28a745;
+        color: white;
+        border-radius: 8px;
+        z-index: 1000;
+        animation: slideIn 0.5s ease-out;
+    }
+    
+    @keyframes slideIn {
+        from {
+            transform: translateX(100%);
+            opacity: 0;
+        }
+        to {
+            transform: translateX(0);
+            opacity: 1;
+        }
+    }
+    </style>
+"""
+
+# Penjelasan BMI
+BMI_EXPLANATION = """
+### Apa itu BMI?
+Body Mass Index (BMI) atau Indeks Massa Tubuh (IMT) adalah pengukuran yang digunakan untuk menilai apakah berat badan seseorang berada dalam kategori normal, kurang, atau berlebih. BMI dihitung dengan membagi berat badan (dalam kilogram) dengan kuadrat tinggi badan (dalam meter).
+"""
+
+# Penjelasan Kategori BMI
+BMI_CATEGORY_EXPLANATION = """
+### Kategori BMI
+- **Insufficient Weight (< 18.5)**: 
+  Berat badan kurang dari normal, berisiko terhadap beberapa masalah kesehatan.
+
+- **Normal Weight (18.5 - 24.9)**: 
+  Berat badan ideal, menunjukkan keseimbangan yang baik.
+
+- **Overweight Level I (25.0 - 29.9)**: 
+  Berat badan berlebih tingkat awal.
+
+- **Overweight Level II (30.0 - 34.9)**: 
+  Obesitas tingkat I, berisiko terhadap penyakit metabolik.
+
+- **Overweight Level III (35.0 - 39.9)**: 
+  Obesitas tingkat II, risiko kesehatan serius.
+
+- **Overweight Level IV (≥ 40)**: 
+  Obesitas tingkat III, risiko kesehatan sangat serius.
+"""
+
+# Penjelasan BMR
+BMR_EXPLANATION = """
+### Apa itu BMR?
+Basal Metabolic Rate (BMR) atau Laju Metabolisme Basal adalah jumlah kalori yang dibutuhkan tubuh untuk menjalankan fungsi dasar saat istirahat, seperti bernafas, mengatur suhu tubuh, dan memelihara fungsi organ vital. BMR berbeda untuk setiap orang dan dipengaruhi oleh faktor seperti usia, jenis kelamin, berat badan, dan tinggi badan.
+"""
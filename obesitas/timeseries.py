@@ -0,0 +1,113 @@
+"""Agregat deret waktu BMI: resampling harian/mingguan dan downsampling.
+
+Semua fungsi bekerja pada ``TrendStats`` (array per bucket berisi jumlah
+entri, total, minimum, dan maksimum) sehingga bucket bisa digabung lagi
+tanpa kembali ke data mentah. Grafik tidak pernah menerima lebih dari
+``MAX_POINTS`` titik.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# Batas jumlah titik yang dikirim ke browser
+MAX_POINTS = 400
+
+# Label resolusi di UI -> kode resolusi
+RESOLUTIONS = {
+    'Per Entri': 'raw',
+    'Harian': 'D',
+    'Mingguan': 'W',
+}
+
+
+class TrendStats(NamedTuple):
+    time: np.ndarray  # datetime64, awal setiap bucket
+    count: np.ndarray
+    total: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / self.count
+
+
+# Fungsi untuk membuat statistik dari titik mentah (satu bucket per titik)
+def raw_stats(times, values) -> TrendStats:
+    times = np.asarray(times, dtype='datetime64[s]')
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnat(times) & ~np.isnan(values)
+    times, values = times[keep], values[keep]
+    order = np.argsort(times, kind='stable')
+    times, values = times[order], values[order]
+    return TrendStats(times, np.ones(len(values)), values, values.copy(), values.copy())
+
+
+# Gabungkan bucket berurutan yang dimulai di `starts` (indeks terurut) menjadi satu
+def _merge(stats: TrendStats, starts: np.ndarray) -> TrendStats:
+    if not len(stats.time):
+        return stats
+    return TrendStats(
+        stats.time[starts],
+        np.add.reduceat(stats.count, starts),
+        np.add.reduceat(stats.total, starts),
+        np.minimum.reduceat(stats.minimum, starts),
+        np.maximum.reduceat(stats.maximum, starts),
+    )
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+
+
+# Fungsi untuk resample ke bucket harian ('D') atau mingguan ('W', mulai Senin)
+def resample(stats: TrendStats, freq: str) -> TrendStats:
+    days = stats.time.astype('datetime64[D]')
+    if freq == 'D':
+        keys = days
+    elif freq == 'W':
+        # 1970-01-01 jatuh pada hari Kamis; geser 3 hari agar minggu dimulai Senin
+        keys = (days.astype(np.int64) + 3) // 7 * 7 - 3
+        keys = keys.astype('datetime64[D]')
+    else:
+        raise ValueError(f"Resolusi tidak dikenal: {freq}")
+    starts = _group_starts(keys)
+    merged = _merge(stats, starts)
+    return merged._replace(time=keys[starts].astype('datetime64[s]'))
+
+
+# Fungsi untuk membatasi jumlah bucket dengan menggabungkan bucket berdekatan
+def downsample(stats: TrendStats, max_points: int = MAX_POINTS) -> TrendStats:
+    size = len(stats.time)
+    if size <= max_points:
+        return stats
+    step = -(-size // max_points)
+    return _merge(stats, np.arange(0, size, step))
+
+
+def aggregate(stats: TrendStats, freq: str = 'raw', max_points: int = MAX_POINTS) -> TrendStats:
+    if freq != 'raw':
+        stats = resample(stats, freq)
+    return downsample(stats, max_points)
+
+
+# Fungsi untuk membuat grafik rata-rata dengan pita min-max
+def trend_figure(stats: TrendStats, title: str = 'Trend BMI'):
+    import plotly.graph_objects as go
+
+    times = stats.time.astype('datetime64[ms]').astype(object)
+    fig = go.Figure()
+    # Pita min-max hanya berarti jika ada bucket berisi lebih dari satu entri
+    if len(stats.time) and stats.count.max() > 1:
+        fig.add_trace(go.Scatter(x=times, y=stats.maximum, mode='lines', line={'width': 0},
+                                 name='Maks', hoverinfo='skip', showlegend=False))
+        fig.add_trace(go.Scatter(x=times, y=stats.minimum, mode='lines', line={'width': 0},
+                                 fill='tonexty', fillcolor='rgba(0, 102, 204, 0.15)', name='Rentang min-maks'))
+    fig.add_trace(go.Scatter(
+        x=times, y=stats.mean, mode='lines+markers', name='Rata-rata BMI',
+        line={'color': '#0066cc'}, customdata=np.stack([stats.count, stats.minimum, stats.maximum], axis=1),
+        hovertemplate="%{x}<br>BMI rata-rata %{y:.2f}<br>min %{customdata[1]:.2f}, maks %{customdata[2]:.2f}"
+                      "<br>%{customdata[0]:.0f} entri<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title='Waktu', yaxis_title='BMI', xaxis_type='date')
+    return fig
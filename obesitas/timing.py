@@ -0,0 +1,192 @@
+"""Pengukuran waktu per fase rerun dan ekspor metrik format teks Prometheus.
+
+Satu rerun diukur dengan ``RerunTimer``: setiap ``lap(nama)`` mencatat waktu
+sejak lap sebelumnya ke fase tersebut, sehingga instrumentasi cukup satu
+baris di akhir setiap bagian skrip. Hasilnya dikumpulkan di ``TimingRegistry``
+(histogram per fase + beberapa rerun terakhir) yang bisa ditampilkan di panel
+admin, ditulis sebagai log JSON, atau diambil dari endpoint ``/metrics``.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import METRICS_HOST, TIMING_LOG
+
+logger = logging.getLogger(__name__)
+if TIMING_LOG and not logger.handlers:
+    # Streamlit tidak mengonfigurasi root logger; pasang handler sendiri agar log terlihat
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Batas atas bucket histogram (detik)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "obesitas"
+
+
+class _PhaseStats:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self, size: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * size
+
+
+class TimingRegistry:
+    """Counter waktu per fase, aman dipakai dari banyak sesi/thread."""
+
+    def __init__(self, recent: int = 50, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.reruns = 0
+        self._phases = {}
+        self._recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def _observe(self, phase: str, seconds: float) -> None:
+        stats = self._phases.get(phase)
+        if stats is None:
+            stats = self._phases[phase] = _PhaseStats(len(self.buckets))
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                stats.buckets[i] += 1
+                break
+
+    # Catat satu pengukuran di luar rerun (mis. export yang dibangun saat download)
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._observe(phase, seconds)
+
+    def rerun(self) -> 'RerunTimer':
+        return RerunTimer(self)
+
+    def record_rerun(self, phases: dict, total: float, **labels) -> dict:
+        record = {
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'total_ms': round(total * 1000, 3),
+            'phases_ms': {phase: round(seconds * 1000, 3) for phase, seconds in phases.items()},
+            **labels,
+        }
+        with self._lock:
+            self.reruns += 1
+            for phase, seconds in phases.items():
+                self._observe(phase, seconds)
+            self._observe('total', total)
+            self._recent.append(record)
+        if TIMING_LOG:
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return record
+
+    def recent(self) -> list:
+        """Rerun terakhir, terbaru lebih dulu."""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                phase: {
+                    'count': stats.count,
+                    'mean_ms': round(stats.total / stats.count * 1000, 3),
+                    'max_ms': round(stats.max * 1000, 3),
+                    'total_s': round(stats.total, 3),
+                }
+                for phase, stats in self._phases.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.reruns = 0
+            self._phases.clear()
+            self._recent.clear()
+
+    def prometheus_text(self, gauges: dict = None) -> str:
+        """Metrik dalam format teks Prometheus; `gauges` berisi nama -> nilai tambahan."""
+        name = f"{METRIC_PREFIX}_phase_seconds"
+        with self._lock:
+            lines = [
+                f"# HELP {METRIC_PREFIX}_reruns_total Jumlah rerun yang selesai.",
+                f"# TYPE {METRIC_PREFIX}_reruns_total counter",
+                f"{METRIC_PREFIX}_reruns_total {self.reruns}",
+                f"# HELP {name} Durasi setiap fase rerun.",
+                f"# TYPE {name} histogram",
+            ]
+            for phase, stats in sorted(self._phases.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {stats.count}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {stats.total:.6f}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {stats.count}')
+        for gauge, value in (gauges or {}).items():
+            lines.append(f"# TYPE {METRIC_PREFIX}_{gauge} gauge")
+            lines.append(f"{METRIC_PREFIX}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class RerunTimer:
+    """Stopwatch satu rerun; `lap(fase)` menutup fase yang sedang berjalan."""
+
+    __slots__ = ('registry', 'phases', 'started', '_last')
+
+    def __init__(self, registry: TimingRegistry):
+        self.registry = registry
+        self.phases = {}
+        self.started = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self, **labels) -> dict:
+        return self.registry.record_rerun(self.phases, time.perf_counter() - self.started, **labels)
+
+
+# Registry bersama untuk semua sesi dalam satu proses
+REGISTRY = TimingRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        data = self.server.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# Fungsi untuk menjalankan endpoint /metrics di thread latar
+def start_metrics_server(port: int, host: str = METRICS_HOST, registry: TimingRegistry = REGISTRY,
+                         gauges=None) -> ThreadingHTTPServer:
+    """`gauges` adalah callable opsional yang mengembalikan dict gauge tambahan.
+
+    Mengembalikan None jika port tidak bisa dipakai (mis. sudah dipakai worker
+    lain); aplikasi tetap berjalan tanpa endpoint /metrics.
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as err:
+        logger.warning("Endpoint /metrics di %s:%d tidak dijalankan: %s", host, port, err)
+        return None
+    server.daemon_threads = True
+    server.render = lambda: registry.prometheus_text(gauges() if gauges else None)
+    threading.Thread(target=server.serve_forever, name="obesitas-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,289 @@
+"""Benchmark jalur panas: skor, rekomendasi, simulasi, grafik, dan riwayat.
+
+Setiap benchmark mencatat latensi per pemanggilan (p50/p90/p99), throughput
+(item/detik), dan puncak memori (tracemalloc, satu pemanggilan) ke JSON.
+Hasil bisa dibandingkan dengan baseline sebelumnya.
+
+Contoh:
+    python scripts/benchmark.py --save bench/baseline.json
+    python scripts/benchmark.py --baseline bench/baseline.json --tolerance 0.25
+    python scripts/benchmark.py --filter history --quick
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obesitas.analysis import RECOMMENDATION_FIELDS, run_analysis  # noqa: E402
+from obesitas.bulk import score_chunk, to_form_scale, translate_labels  # noqa: E402
+from obesitas.charts import bmi_scale_figure, bmi_scale_json, bmi_scale_spec, figure_from_spec  # noqa: E402
+from obesitas.config import DATASET_PATH  # noqa: E402
+from obesitas.history import HistoryBuffer, HistoryStore  # noqa: E402
+from obesitas.metrics import calculate_metrics, calculate_metrics_batch  # noqa: E402
+from obesitas.model import load_or_train_model  # noqa: E402
+from obesitas.recommendations import generate_recommendations, generate_recommendations_batch  # noqa: E402
+from obesitas.scenarios import ScenarioGrid, run_scenarios, scenario_heatmap  # noqa: E402
+from obesitas.timeseries import aggregate, trend_figure  # noqa: E402
+from loadtest import random_profile  # noqa: E402
+
+SYNTHETIC_ROWS = 1_000_000
+HISTORY_SIZES = (10, 1_000, 100_000)
+# Baris per halaman pada benchmark store_page (sama dengan default tab Riwayat)
+PAGE_ROWS = 50
+
+
+class Benchmark(NamedTuple):
+    name: str
+    items: int
+    # setup() -> state; run(state) diukur; setup dan reset tidak ikut diukur
+    setup: Callable
+    run: Callable
+    # reset(state) dipanggil setelah setiap run agar ukuran state tetap sama
+    reset: Callable = None
+
+
+# Fungsi untuk membuat baris sintetis dengan distribusi mirip dataset bawaan
+def synthetic_rows(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(DATASET_PATH)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    for col, spread in (('Age', 2.0), ('Height', 0.03), ('Weight', 4.0)):
+        df[col] = df[col] + rng.normal(0, spread, n)
+    return df
+
+
+def form_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    df = translate_labels(raw)
+    form = to_form_scale(df)
+    for col in ('gender', 'age', 'height', 'weight'):
+        form[col] = df[col]
+    return form
+
+
+def history_records(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    records = []
+    for i in range(n):
+        profile = random_profile(rng)
+        bmi, bmr, category, _ = calculate_metrics(profile['weight'], profile['height'], profile['age'], profile['gender'])
+        records.append({
+            'timestamp': start + datetime.timedelta(minutes=37 * i),
+            'name': f"pengguna-{i % 50}",
+            'age': profile['age'],
+            'gender': profile['gender'],
+            'height': profile['height'],
+            'weight': profile['weight'],
+            'bmi': round(bmi, 2),
+            'bmr': round(bmr, 2),
+            'category': category,
+            'prediction': None,
+            'FAF': profile['FAF'],
+            'TUE': profile['TUE'],
+            'CH2O': profile['CH2O'],
+            'SMOKE': profile['SMOKE'],
+        })
+    return records
+
+
+def filled_buffer(records: list) -> HistoryBuffer:
+    buffer = HistoryBuffer()
+    for record in records:
+        buffer.append(record)
+    return buffer
+
+
+def filled_store(records: list) -> HistoryStore:
+    store = HistoryStore(':memory:')
+    for record in records:
+        store.append(record)
+    return store
+
+
+def drop_appended(state):
+    # Buang entri terlama yang setara dengan entri tambahan run; ukuran riwayat tetap n
+    buffer, _ = state
+    buffer.drop_oldest(1)
+
+
+def rebuild_frame(state):
+    # Satu entri baru lalu rerun: DataFrame sesi dibangun ulang dari kolom NumPy
+    buffer, record = state
+    buffer.append(record)
+    return buffer.to_frame()
+
+
+def session_trend(state):
+    buffer, record = state
+    buffer.append(record)
+    return trend_figure(aggregate(buffer.trend()))
+
+
+# Daftar benchmark; `quick` memperkecil ukuran besar untuk pemeriksaan cepat
+def build_benchmarks(quick: bool = False) -> list:
+    synthetic = 50_000 if quick else SYNTHETIC_ROWS
+    history_sizes = tuple(min(n, 10_000) for n in HISTORY_SIZES) if quick else HISTORY_SIZES
+    profile = random_profile(random.Random(1))
+    rec_input = {field: profile[field] for field in RECOMMENDATION_FIELDS}
+    grid = ScenarioGrid()
+
+    benchmarks = [
+        Benchmark('single/calculate_metrics', 1, lambda: profile,
+                  lambda p: calculate_metrics(p['weight'], p['height'], p['age'], p['gender'])),
+        Benchmark('single/generate_recommendations', 1, lambda: rec_input,
+                  lambda p: generate_recommendations("Overweight Level I", p)),
+        Benchmark('single/run_analysis', 1, lambda: (profile, load_or_train_model()),
+                  lambda state: run_analysis(state[0], state[1])),
+        Benchmark('scenario/run_scenarios', len(grid), lambda: (profile, load_or_train_model()),
+                  lambda state: run_scenarios(state[0], grid, state[1])),
+        Benchmark('scenario/scenario_heatmap', len(grid), lambda: run_scenarios(profile, grid, load_or_train_model()),
+                  lambda scenarios: scenario_heatmap(scenarios, grid, 'prediction_level')),
+        Benchmark('figure/bmi_scale_spec', 1, lambda: None, lambda _: bmi_scale_spec(27.3, '#ffd43b')),
+        Benchmark('figure/bmi_scale_json', 1, lambda: None, lambda _: bmi_scale_json(27.3, '#ffd43b')),
+        Benchmark('figure/figure_from_spec', 1, lambda: bmi_scale_spec(27.3, '#ffd43b'), figure_from_spec),
+        Benchmark('figure/bmi_scale_figure', 1, lambda: None, lambda _: bmi_scale_figure(27.3, '#ffd43b')),
+    ]
+
+    for label, rows in (('csv', None), (f'{synthetic // 1000}k', synthetic)):
+        def raw(rows=rows):
+            return pd.read_csv(DATASET_PATH) if rows is None else synthetic_rows(rows)
+
+        items = len(pd.read_csv(DATASET_PATH)) if rows is None else rows
+        benchmarks += [
+            Benchmark(f'batch-{label}/calculate_metrics_batch', items,
+                      lambda raw=raw: translate_labels(raw()), calculate_metrics_batch),
+            Benchmark(f'batch-{label}/generate_recommendations_batch', items,
+                      lambda raw=raw: (lambda form: (calculate_metrics_batch(form)['category'], form))(form_frame(raw())),
+                      lambda state: generate_recommendations_batch(*state)),
+            Benchmark(f'batch-{label}/score_chunk', items, raw, lambda df: score_chunk(df.copy())),
+        ]
+
+    for n in history_sizes:
+        benchmarks += [
+            Benchmark(f'history-{n}/to_frame', n,
+                      lambda n=n: (filled_buffer(history_records(n)), history_records(1, seed=1)[0]), rebuild_frame,
+                      drop_appended),
+            Benchmark(f'history-{n}/session_trend', n,
+                      lambda n=n: (filled_buffer(history_records(n)), history_records(1, seed=1)[0]), session_trend,
+                      drop_appended),
+            # Item = baris yang benar-benar diambil satu halaman, bukan ukuran riwayat
+            Benchmark(f'history-{n}/store_page', min(n, PAGE_ROWS),
+                      lambda n=n: filled_store(history_records(n)), lambda store: store.page(0, PAGE_ROWS)),
+            Benchmark(f'history-{n}/store_daily_trend', n,
+                      lambda n=n: filled_store(history_records(n)),
+                      lambda store: trend_figure(aggregate(store.daily_trend(), 'D'))),
+        ]
+    return benchmarks
+
+
+# Fungsi untuk menjalankan satu benchmark
+def measure(bench: Benchmark, min_time: float, max_repeat: int) -> dict:
+    reset = bench.reset or (lambda state: None)
+    state = bench.setup()
+    bench.run(state)  # pemanasan: cache, impor, JIT halaman memori
+    reset(state)
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < 3 or (time.perf_counter() - started < min_time and len(latencies) < max_repeat):
+        t0 = time.perf_counter()
+        bench.run(state)
+        latencies.append(time.perf_counter() - t0)
+        reset(state)
+
+    tracemalloc.start()
+    bench.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.asarray(latencies)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        'items': bench.items,
+        'repeat': len(latencies),
+        'p50_ms': round(float(p50), 4),
+        'p90_ms': round(float(p90), 4),
+        'p99_ms': round(float(p99), 4),
+        'items_per_s': round(bench.items / float(np.median(latencies)), 1),
+        'peak_memory_mb': round(peak / (1024 * 1024), 3),
+    }
+
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+# Fungsi untuk membandingkan hasil dengan baseline; p50 naik melebihi toleransi dianggap regresi
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratio = current['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else float('inf')
+        memory_ratio = (current['peak_memory_mb'] / previous['peak_memory_mb']
+                        if previous['peak_memory_mb'] else 1.0)
+        flag = ratio > 1 + tolerance or memory_ratio > 1 + tolerance
+        print(f"{'REGRESI' if flag else 'ok':8} {name:55} p50 {previous['p50_ms']:>10.3f} -> {current['p50_ms']:>10.3f} ms"
+              f" ({ratio:5.2f}x)  memori {memory_ratio:5.2f}x")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help="Hanya jalankan benchmark yang namanya memuat teks ini")
+    parser.add_argument('--quick', action='store_true', help="Ukuran besar diperkecil (50k baris, riwayat maks 10k)")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Waktu minimum per benchmark (detik)")
+    parser.add_argument('--max-repeat', type=int, default=10_000)
+    parser.add_argument('--save', help="Simpan hasil sebagai JSON baseline")
+    parser.add_argument('--baseline', help="Bandingkan dengan JSON baseline sebelumnya")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Kenaikan p50/memori yang masih diterima")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for bench in build_benchmarks(args.quick):
+        if args.filter not in bench.name:
+            continue
+        results[bench.name] = measure(bench, args.min_time, args.max_repeat)
+        r = results[bench.name]
+        print(f"{bench.name:55} p50 {r['p50_ms']:>10.3f} ms  p99 {r['p99_ms']:>10.3f} ms  "
+              f"{r['items_per_s']:>14,.0f} item/s  {r['peak_memory_mb']:>9.2f} MB", flush=True)
+
+    report = {'environment': environment(), 'quick': args.quick, 'results': results}
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('quick') != args.quick:
+            print("Peringatan: baseline dibuat dengan mode --quick yang berbeda", file=sys.stderr)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Pastikan logika inti bisa diimpor tanpa Streamlit, Plotly, dan pandas, dalam batas waktu.
+
+Contoh:
+    python scripts/check_import_time.py --budget-ms 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul berat yang tidak boleh ikut termuat oleh impor inti
+FORBIDDEN = ('streamlit', 'plotly', 'pandas', 'sklearn')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import obesitas
+from obesitas import calculate_metrics, generate_recommendations, analyze
+calculate_metrics(70, 1.7, 30, "Laki-laki")
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'elapsed_ms': elapsed * 1000,
+    'loaded': sorted({name.split('.')[0] for name in sys.modules} & set(%r)),
+}))
+"""
+
+
+# Fungsi untuk mengukur impor inti di interpreter baru
+def measure(repeat: int = 5) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE % (FORBIDDEN,)],
+            cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output))
+    return {
+        'elapsed_ms': round(min(run['elapsed_ms'] for run in runs), 2),
+        'loaded': sorted({name for run in runs for name in run['loaded']}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    report = measure(args.repeat)
+    report['budget_ms'] = args.budget_ms
+    print(json.dumps(report, indent=2))
+
+    if report['loaded']:
+        print(f"GAGAL: impor inti memuat {', '.join(report['loaded'])}", file=sys.stderr)
+        return 1
+    if report['elapsed_ms'] > args.budget_ms:
+        print(f"GAGAL: impor inti {report['elapsed_ms']} ms melebihi batas {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Load test lokal untuk obesitas.api; melaporkan throughput dan latensi p50/p90/p99.
+
+Contoh:
+    python scripts/loadtest.py --requests 5000 --concurrency 32
+    python scripts/loadtest.py --url http://127.0.0.1:8000 --endpoint /score/batch --batch-size 100
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obesitas.api import create_server  # noqa: E402
+from obesitas.model import load_or_train_model  # noqa: E402
+
+CHOICES = {
+    'gender': ["Laki-laki", "Perempuan"],
+    'family_history': ["ya", "tidak"],
+    'FAVC': ["ya", "tidak"],
+    'FCVC': [1, 2, 3],
+    'NCP': ["1", "2", "3", "4"],
+    'CAEC': ["Tidak Pernah", "Kadang", "Sering", "Selalu"],
+    'SMOKE': ["ya", "tidak"],
+    'FAF': ["1", "2", "3"],
+    'CALC': ["Tidak Pernah", "Kadang", "Sering", "Selalu"],
+    'SCC': ["ya", "tidak"],
+    'MTRANS': ["Mobil", "Motor", "Sepeda", "Transportasi Publik", "Jalan Kaki"],
+}
+
+
+def random_profile(rng: random.Random) -> dict:
+    profile = {field: rng.choice(options) for field, options in CHOICES.items()}
+    profile.update({
+        'age': rng.randint(15, 80),
+        'height': round(rng.uniform(1.45, 1.95), 2),
+        'weight': round(rng.uniform(40, 150), 1),
+        'CH2O': round(rng.uniform(1, 4), 1),
+        'TUE': round(rng.uniform(0, 12), 1),
+    })
+    return profile
+
+
+def run(url: str, endpoint: str, total: int, concurrency: int, batch_size: int, distinct: int) -> dict:
+    parsed = urlparse(url)
+    rng = random.Random(42)
+    # Sejumlah profil berbeda dipakai berulang, seperti pengguna yang mengecek ulang
+    pool = [random_profile(rng) for _ in range(distinct)]
+    if endpoint == '/score/batch':
+        batches = [rng.sample(pool, batch_size) for _ in range(32)]
+        bodies = [json.dumps({'profiles': batch}).encode() for batch in batches]
+    else:
+        batches = [[profile] for profile in pool]
+        bodies = [json.dumps(profile).encode() for profile in pool]
+    # Throughput profil dihitung dari isi body sebenarnya
+    sizes = np.array([len(batch) for batch in batches], dtype=np.int64)
+
+    local = threading.local()
+    latencies = np.empty(total, dtype=np.float64)
+    errors = []
+
+    def send(i: int) -> None:
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+        body = bodies[i % len(bodies)]
+        start = time.perf_counter()
+        try:
+            conn.request('POST', endpoint, body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as err:
+            errors.append(repr(err))
+            local.conn = None
+        latencies[i] = time.perf_counter() - start
+
+    profiles = int(sizes[np.arange(total) % len(bodies)].sum())
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(total)))
+    elapsed = time.perf_counter() - started
+
+    p50, p90, p99 = np.percentile(latencies * 1000, [50, 90, 99])
+    return {
+        'endpoint': endpoint,
+        'requests': total,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(total / elapsed, 1),
+        'profiles_per_s': round(profiles / elapsed, 1),
+        'p50_ms': round(p50, 2),
+        'p90_ms': round(p90, 2),
+        'p99_ms': round(p99, 2),
+        'max_ms': round(latencies.max() * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="URL API yang sudah berjalan; jika kosong server lokal dijalankan di proses ini")
+    parser.add_argument('--endpoint', default='/score', choices=['/score', '/score/batch'])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=16, help="Ukuran worker pool server lokal")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--distinct', type=int, default=500, help="Jumlah profil berbeda yang dikirim")
+    parser.add_argument('--no-model', action='store_true')
+    args = parser.parse_args(argv)
+    if args.endpoint == '/score/batch' and args.batch_size > args.distinct:
+        parser.error("--batch-size tidak boleh lebih besar dari --distinct")
+
+    server = None
+    url = args.url
+    if url is None:
+        model = None if args.no_model else load_or_train_model()
+        server = create_server('127.0.0.1', 0, args.workers, model)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report = run(url, args.endpoint, args.requests, args.concurrency, args.batch_size, args.distinct)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+from obesitas.analysis import analyze, profile_fingerprint
+from obesitas.cache import TTLCache
+from obesitas.metrics import calculate_metrics
+
+PROFILE = {
+    'gender': 'Laki-laki', 'age': 25, 'height': 1.755, 'weight': 70.456,
+    'family_history': 'ya', 'FAVC': 'ya', 'FCVC': 2, 'NCP': '3', 'CAEC': 'Kadang',
+    'SMOKE': 'tidak', 'CH2O': 2.0, 'SCC': 'tidak', 'FAF': '2', 'TUE': 3.0,
+    'CALC': 'Kadang', 'MTRANS': 'Mobil',
+}
+
+
+def test_analyze_uses_exact_inputs():
+    # Pembulatan ke 2 desimal akan memberi BMI 23.01, bukan 22.88
+    bmi, bmr, category, _ = calculate_metrics(70.456, 1.755, 25, 'Laki-laki')
+    result = analyze(PROFILE, cache=TTLCache())
+    assert round(result.bmi, 2) == 22.88
+    assert (result.bmi, result.bmr, result.category) == (bmi, bmr, category)
+
+
+def test_cache_does_not_merge_nearby_inputs():
+    cache = TTLCache()
+    first = analyze(PROFILE, cache=cache)
+    second = analyze({**PROFILE, 'height': 1.7549}, cache=cache)
+    assert first.bmi != second.bmi
+    assert profile_fingerprint(PROFILE) != profile_fingerprint({**PROFILE, 'height': 1.7549})
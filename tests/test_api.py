@@ -0,0 +1,50 @@
+import pytest
+
+from obesitas.api import ApiError, ScoringService
+from tests.test_analysis import PROFILE
+
+
+@pytest.fixture(scope='module')
+def service():
+    return ScoringService()
+
+
+def test_single_and_batch_agree(service):
+    single = service.score(PROFILE)
+    batch = service.score_batch({'profiles': [PROFILE]})['results'][0]
+    assert single['bmi'] == batch['bmi'] == 22.88
+    assert single == batch
+
+
+@pytest.mark.parametrize('value', ["inf", "nan", 1e400, "1e400", "abc", None])
+@pytest.mark.parametrize('field', ['weight', 'FAF'])
+def test_non_finite_numbers_are_rejected(service, field, value):
+    with pytest.raises(ApiError) as err:
+        service.score({**PROFILE, field: value})
+    assert err.value.status == 400
+
+
+@pytest.mark.parametrize('field, value', [
+    ('weight', 0), ('weight', -70), ('height', 0),
+    ('FAF', 0), ('FAF', 4), ('FAF', 2.5), ('NCP', 0), ('NCP', 5),
+    ('gender', 'Pria'), ('gender', 'male'), ('SMOKE', 'maybe'), ('CAEC', ['Kadang']), ('MTRANS', 'Pesawat'),
+])
+def test_out_of_range_values_are_rejected(service, field, value):
+    with pytest.raises(ApiError) as err:
+        service.score({**PROFILE, field: value})
+    assert err.value.status == 400
+
+
+def test_dataset_labels_are_translated(service):
+    dataset = {**PROFILE, 'gender': 'Male', 'family_history': 'yes', 'FAVC': 'yes', 'SMOKE': 'no',
+               'SCC': 'no', 'CAEC': 'Sometimes', 'CALC': 'Sometimes', 'MTRANS': 'Automobile'}
+    assert service.score(dataset) == service.score(PROFILE)
+    # Laki-laki dan perempuan dengan isian lain sama memberi BMR berbeda
+    assert service.score(dataset)['bmr'] != service.score({**PROFILE, 'gender': 'Female'})['bmr']
+
+
+def test_batch_error_names_the_profile(service):
+    with pytest.raises(ApiError) as err:
+        service.score_batch({'profiles': [PROFILE, PROFILE, {**PROFILE, 'FAF': 9}]})
+    assert err.value.status == 400
+    assert err.value.message.startswith("Profil #2: ")
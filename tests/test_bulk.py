@@ -0,0 +1,18 @@
+import os
+import time
+
+from obesitas.bulk import new_result_path, remove_stale_results
+
+
+def test_stale_results_are_removed(tmp_path):
+    fresh = new_result_path(str(tmp_path))
+    stale = new_result_path(str(tmp_path))
+    day_ago = time.time() - 86400
+    os.utime(stale, (day_ago, day_ago))
+
+    assert remove_stale_results(str(tmp_path), max_age=3600) == 1
+    assert os.path.exists(fresh) and not os.path.exists(stale)
+
+
+def test_missing_result_dir_is_ignored(tmp_path):
+    assert remove_stale_results(str(tmp_path / 'tidak-ada')) == 0
@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+import pytest
+
+from obesitas.export import build_export
+from obesitas.history import HISTORY_COLUMNS
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def history_rows(n: int, **values) -> pd.DataFrame:
+    df = pd.DataFrame({col: [None] * n for col in HISTORY_COLUMNS})
+    df['timestamp'] = '2026-01-01T00:00:00'
+    df['name'] = 'Budi'
+    for col, value in values.items():
+        df[col] = value
+    return df
+
+
+def test_parquet_chunks_with_different_nullness_share_schema():
+    # Chunk pertama tanpa prediksi dan umur; chunk kedua berisi keduanya
+    chunks = [history_rows(2), history_rows(3, age=30, prediction='Normal Weight', bmi=22.5)]
+    table = pq.read_table(io.BytesIO(build_export(chunks, 'Parquet', HISTORY_COLUMNS)))
+    assert table.num_rows == 5
+    assert table.column_names == list(HISTORY_COLUMNS)
+    assert str(table.schema.field('age').type) == 'int64'
+    assert table.column('prediction').to_pylist() == [None, None] + ['Normal Weight'] * 3
+
+
+def test_parquet_without_rows_is_a_valid_file():
+    table = pq.read_table(io.BytesIO(build_export([], 'Parquet', HISTORY_COLUMNS)))
+    assert table.num_rows == 0
+    assert table.column_names == list(HISTORY_COLUMNS)
+
+
+def test_csv_without_rows_has_header():
+    data = build_export([], 'CSV', HISTORY_COLUMNS)
+    assert list(pd.read_csv(io.BytesIO(data)).columns) == list(HISTORY_COLUMNS)
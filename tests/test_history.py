@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from obesitas.history import HistoryStore
+
+
+def add(store, owner, timestamp, bmi=22.0):
+    store.append({'timestamp': timestamp, 'name': 'Budi', 'bmi': bmi}, owner=owner)
+
+
+def test_purge_removes_only_inactive_owners():
+    store = HistoryStore(':memory:')
+    add(store, 'lama', '2026-01-01 08:00:00')
+    add(store, 'lama', '2026-02-01 08:00:00')
+    # Pemilik aktif tetap menyimpan entri lamanya
+    add(store, 'aktif', '2026-01-01 08:00:00')
+    add(store, 'aktif', '2026-10-01 08:00:00')
+    add(store, None, '2026-01-15 08:00:00')
+
+    assert store.purge(90, now=datetime(2026, 10, 18)) == 3
+    assert store.count(owner='lama') == 0
+    assert store.count() == store.count(owner='aktif') == 2
+    assert len(store.daily_trend(owner='lama').time) == 0
+    assert len(store.daily_trend(owner='aktif').time) == 2
+    assert len(store.daily_trend().time) == 2
+
+
+def test_purge_disabled_with_zero_days():
+    store = HistoryStore(':memory:')
+    add(store, 'lama', '2000-01-01 08:00:00')
+    assert store.purge(0) == 0
+    assert store.count() == 1
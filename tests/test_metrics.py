@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from obesitas.metrics import BMI_BINS, calculate_metrics, calculate_metrics_batch
+
+
+def assert_batch_matches_scalar(weight, height, age, gender):
+    batch = calculate_metrics_batch(weight=weight, height=height, age=age, gender=gender)
+    for i, row in enumerate(batch.itertuples(index=False)):
+        expected = calculate_metrics(float(weight[i]), float(height[i]), float(age[i]), gender[i])
+        # Harus bit-identik, bukan sekadar mendekati
+        assert (row.bmi, row.bmr, row.category, row.color) == expected, (weight[i], height[i], age[i], gender[i])
+
+
+def test_batch_matches_scalar_on_random_rows():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    assert_batch_matches_scalar(
+        rng.uniform(5, 300, n),
+        rng.uniform(1.0, 2.5, n),
+        rng.integers(15, 100, n).astype(float),
+        rng.choice(["Laki-laki", "Perempuan"], n),
+    )
+
+
+@pytest.mark.parametrize('height', [1.0, 2.0])
+def test_batch_matches_scalar_at_category_boundaries(height):
+    # Berat yang memberi BMI tepat di batas kategori, dan satu ulp di kedua sisinya
+    exact = np.array(BMI_BINS) * height * height
+    weight = np.concatenate([exact, np.nextafter(exact, -np.inf), np.nextafter(exact, np.inf)])
+    n = len(weight)
+    assert_batch_matches_scalar(weight, np.full(n, height), np.full(n, 30.0), ["Perempuan"] * n)
+
+
+@pytest.mark.parametrize('bmi, category', [
+    (18.5, "Normal Weight"),
+    (25.0, "Overweight Level I"),
+    (30.0, "Overweight Level II"),
+    (35.0, "Overweight Level III"),
+    (40.0, "Overweight Level IV"),
+])
+def test_boundary_belongs_to_upper_category(bmi, category):
+    assert calculate_metrics(bmi, 1.0, 30, "Perempuan")[2] == category
+    assert calculate_metrics_batch(weight=[bmi], height=[1.0], age=[30], gender=["Perempuan"])['category'][0] == category
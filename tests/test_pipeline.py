@@ -0,0 +1,33 @@
+import json
+import os
+
+import pytest
+
+from obesitas.config import DATASET_PATH
+from obesitas.pipeline import run_pipeline
+
+
+@pytest.fixture
+def sources(tmp_path):
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        lines = f.readlines()[:21]
+    data = tmp_path / 'data.csv'
+    data.write_text(''.join(lines), encoding='utf-8')
+    empty = tmp_path / 'kosong.csv'
+    empty.write_text(lines[0], encoding='utf-8')
+    return [str(data), str(empty)]
+
+
+def test_header_only_input_gets_a_manifest(tmp_path, sources):
+    out = tmp_path / 'hasil'
+    report = run_pipeline(sources, str(out), workers=1)
+    assert report['files'] == 2
+    assert report['rows'] == 20
+    with open(out / '001-kosong' / '_manifest.json', encoding='utf-8') as f:
+        assert json.load(f) == {'source': sources[1], 'partitions': {}, 'rows': 0}
+
+
+def test_overwrite_refuses_output_containing_inputs(tmp_path, sources):
+    with pytest.raises(ValueError):
+        run_pipeline(sources, str(tmp_path), workers=1, overwrite=True)
+    assert all(os.path.exists(source) for source in sources)
@@ -0,0 +1,148 @@
+import pandas as pd
+import pytest
+
+from obesitas.recommendations import (
+    DIET_KEY, EXERCISE_KEY, LIFESTYLE_KEY, TARGET_KEY,
+    generate_recommendations, generate_recommendations_batch,
+)
+
+# Isian netral: tidak ada aturan diet, olahraga, atau gaya hidup yang terpicu
+BASE = {'FAVC': 'tidak', 'FCVC': 3.0, 'NCP': '3', 'CAEC': 'Kadang',
+        'TUE': 1.0, 'CH2O': 3.0, 'SMOKE': 'tidak', 'FAF': '2'}
+
+# Teks di bawah disalin dari generate_recommendations sebelum dipindah ke tabel aturan
+TARGET_GAIN = "Meningkatkan berat badan 0.5-1 kg per minggu hingga mencapai BMI minimal 18.5"
+TARGET_KEEP = "Mempertahankan berat badan current dengan fluktuasi maksimal 2 kg"
+TARGET_LOSE = "Menurunkan berat badan 0.5-1 kg per minggu hingga mencapai BMI 24.9"
+
+DIET_GAIN = [
+    "Tingkatkan asupan kalori 500-1000 kkal di atas kebutuhan maintenance",
+    "Konsumsi protein tinggi (1.6-2.2 gram/kg berat badan)",
+    "Makan 5-6 kali sehari dengan porsi sedang",
+    "Fokus pada makanan padat nutrisi dan kalori",
+]
+DIET_KEEP = [
+    "Pertahankan asupan kalori sesuai kebutuhan maintenance",
+    "Konsumsi protein 1.2-1.6 gram/kg berat badan",
+    "Jaga pola makan 3 kali sehari dengan 2 snack",
+    "Seimbangkan makronutrien (50% karbo, 30% protein, 20% lemak)",
+]
+DIET_LOSE = [
+    "Kurangi asupan kalori 500-750 kkal di bawah maintenance",
+    "Tingkatkan protein (1.8-2.2 gram/kg ideal body weight)",
+    "Batasi karbohidrat sederhana dan lemak jenuh",
+    "Makan 3 kali sehari dengan porsi terkontrol",
+    "Utamakan sayuran dan protein lean",
+]
+
+EXERCISE = {
+    "1": [
+        "Mulai dengan 30 menit jalan kaki setiap hari",
+        "Tambahkan latihan kekuatan 2x seminggu",
+        "Target: 150 menit aktivitas sedang per minggu",
+        "Fokus pada latihan dasar seperti squat, push-up, dan plank",
+    ],
+    "2": [
+        "Pertahankan rutinitas olahraga 3-4x seminggu",
+        "Kombinasikan cardio dan strength training",
+        "Target: 200 menit aktivitas sedang per minggu",
+        "Tambahkan variasi latihan untuk menghindari plateau",
+    ],
+    "3": [
+        "Lanjutkan rutinitas olahraga intensif",
+        "Fokus pada high-intensity interval training (HIIT)",
+        "Target: 250-300 menit aktivitas sedang per minggu",
+        "Pertimbangkan untuk bekerja dengan personal trainer",
+    ],
+}
+
+LIFESTYLE_DEFAULT = [
+    "Pertahankan gaya hidup sehat",
+    "Jaga kualitas tidur 7-9 jam per hari",
+    "Kelola stress dengan meditasi atau yoga",
+    "Lakukan check-up kesehatan rutin",
+]
+WATER = "Tingkatkan konsumsi air minimal 2L/hari"
+SMOKE = "Pertimbangkan program berhenti merokok"
+SCREEN = [
+    "Kurangi screen time, gunakan teknik 20-20-20 untuk kesehatan mata",
+    "Atur postur saat menggunakan gadget",
+]
+SCREEN_WARNING = "Perhatian: Waktu screen time tinggi"
+
+# (kategori, isian yang diubah dari BASE, diet, olahraga, gaya hidup, target)
+CASES = [
+    pytest.param("Insufficient Weight", {}, DIET_GAIN, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_GAIN,
+                 id='insufficient'),
+    pytest.param("Normal Weight", {}, DIET_KEEP, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='normal'),
+    pytest.param("Overweight Level I", {}, DIET_LOSE, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_LOSE,
+                 id='overweight'),
+    pytest.param("Kategori Lain", {}, DIET_LOSE, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_LOSE,
+                 id='unknown-category'),
+    pytest.param("Insufficient Weight", {'FAVC': 'ya'},
+                 DIET_GAIN + ["Perhatian: Anda sering mengonsumsi makanan tinggi kalori"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_GAIN, id='favc'),
+    pytest.param("Normal Weight", {'FCVC': 1.5},
+                 DIET_KEEP + ["Perhatian: Konsumsi sayur dan buah kurang"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP, id='fcvc'),
+    pytest.param("Normal Weight", {'FCVC': 2.0}, DIET_KEEP, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='fcvc-boundary'),
+    pytest.param("Obesity Type I", {'NCP': '1'},
+                 DIET_LOSE + ["Fokus perbaiki: Jumlah makan utama per hari kurang"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_LOSE, id='ncp-1'),
+    pytest.param("Obesity Type I", {'NCP': '2', 'CAEC': 'Selalu'},
+                 DIET_LOSE + ["Fokus perbaiki: Jumlah makan utama per hari kurang, Sering mengonsumsi camilan"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_LOSE, id='ncp-2-caec-selalu'),
+    pytest.param("Normal Weight", {'CAEC': 'Sering'},
+                 DIET_KEEP + ["Perhatian: Sering mengonsumsi camilan"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP, id='caec-sering'),
+    pytest.param("Overweight Level II", {'FAVC': 'ya', 'FCVC': 1.0, 'NCP': '1', 'CAEC': 'Sering'},
+                 DIET_LOSE + ["Fokus perbaiki: Anda sering mengonsumsi makanan tinggi kalori, "
+                              "Konsumsi sayur dan buah kurang, Jumlah makan utama per hari kurang, "
+                              "Sering mengonsumsi camilan"],
+                 EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_LOSE, id='all-diet-factors'),
+    pytest.param("Normal Weight", {'TUE': 9.0}, DIET_KEEP, EXERCISE["2"] + [SCREEN_WARNING], SCREEN,
+                 TARGET_KEEP, id='tue-above-8'),
+    pytest.param("Normal Weight", {'TUE': 8.0}, DIET_KEEP, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='tue-boundary'),
+    pytest.param("Normal Weight", {'CH2O': 1.5}, DIET_KEEP, EXERCISE["2"], [WATER], TARGET_KEEP,
+                 id='ch2o-below-2'),
+    pytest.param("Normal Weight", {'CH2O': 2.0}, DIET_KEEP, EXERCISE["2"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='ch2o-boundary'),
+    pytest.param("Normal Weight", {'SMOKE': 'ya'}, DIET_KEEP, EXERCISE["2"], [SMOKE], TARGET_KEEP,
+                 id='smoke'),
+    pytest.param("Normal Weight", {'CH2O': 1.0, 'SMOKE': 'ya', 'TUE': 10.0}, DIET_KEEP,
+                 EXERCISE["2"] + [SCREEN_WARNING], [WATER, SMOKE] + SCREEN, TARGET_KEEP,
+                 id='all-lifestyle-factors'),
+    pytest.param("Normal Weight", {'FAF': '1'}, DIET_KEEP, EXERCISE["1"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='faf-1'),
+    pytest.param("Normal Weight", {'FAF': '3'}, DIET_KEEP, EXERCISE["3"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='faf-3'),
+    pytest.param("Normal Weight", {'FAF': '0'}, DIET_KEEP, EXERCISE["1"], LIFESTYLE_DEFAULT, TARGET_KEEP,
+                 id='faf-unknown'),
+    pytest.param("Normal Weight", {'FAF': '7', 'TUE': 12.0}, DIET_KEEP, EXERCISE["1"] + [SCREEN_WARNING],
+                 SCREEN, TARGET_KEEP, id='faf-unknown-tue'),
+]
+
+
+@pytest.mark.parametrize('category, changes, diet, exercise, lifestyle, target', CASES)
+def test_recommendations_match_original_output(category, changes, diet, exercise, lifestyle, target):
+    expected = {DIET_KEY: diet, EXERCISE_KEY: exercise, LIFESTYLE_KEY: lifestyle, TARGET_KEY: target}
+    result = generate_recommendations(category, {**BASE, **changes})
+    assert result == expected
+    # Urutan kunci ikut ditampilkan di UI
+    assert list(result) == [DIET_KEY, EXERCISE_KEY, LIFESTYLE_KEY, TARGET_KEY]
+
+
+def test_batch_matches_table():
+    categories = [case.values[0] for case in CASES]
+    df = pd.DataFrame([{**BASE, **case.values[1]} for case in CASES])
+    batch = generate_recommendations_batch(categories, df)
+    for i, case in enumerate(CASES):
+        _, _, diet, exercise, lifestyle, target = case.values
+        row = batch.iloc[i]
+        assert list(row[DIET_KEY]) == diet, case.id
+        assert list(row[EXERCISE_KEY]) == exercise, case.id
+        assert list(row[LIFESTYLE_KEY]) == lifestyle, case.id
+        assert row[TARGET_KEY] == target, case.id